@@ -1,18 +1,15 @@
 """Dashboard summary endpoints."""
-from fastapi import APIRouter
+import asyncio
+
+from fastapi import APIRouter, Response
+from app.core.cache import ttl_cache
 from app.services.mock_data import store
 from app.services.risk_engine import get_risk_summary
 
 router = APIRouter()
 
 
-@router.get("/summary")
-def get_summary():
-    """
-    Executive summary KPIs for the main dashboard.
-    Returns: total ITC, risk breakdown, vendor stats, mismatch %.
-    """
-    store.initialize()
+def _build_summary() -> dict:
     summary = store.get_dashboard_summary()
     risk    = get_risk_summary()
     trend   = store.get_period_trend()
@@ -27,7 +24,16 @@ def get_summary():
     }
 
 
+@router.get("/summary")
+@ttl_cache(expire=30, etag=True)
+async def get_summary():
+    """
+    Executive summary KPIs for the main dashboard.
+    Returns: total ITC, risk breakdown, vendor stats, mismatch %.
+    """
+    return await asyncio.to_thread(_build_summary)
+
+
 @router.get("/taxpayer")
-def get_taxpayer():
-    store.initialize()
-    return store.taxpayer
+async def get_taxpayer():
+    return Response(content=store.taxpayer_json, media_type="application/json")
@@ -1,5 +1,8 @@
 """Fraud detection endpoints."""
+import asyncio
+
 from fastapi import APIRouter
+from app.core.cache import ttl_cache
 from app.services.fraud_detection import (
     detect_circular_trading,
     detect_suspicious_clusters,
@@ -10,24 +13,27 @@ router = APIRouter()
 
 
 @router.get("/summary")
-def fraud_summary():
+@ttl_cache(expire=30, etag=True)
+async def fraud_summary():
     """High-level fraud detection summary."""
-    return get_fraud_summary()
+    return await asyncio.to_thread(get_fraud_summary)
 
 
 @router.get("/circular-trading")
-def circular_trading():
+@ttl_cache(expire=30, etag=True)
+async def circular_trading():
     """
     Detect circular trading rings in the vendor knowledge graph.
-    Uses DFS cycle detection (mock) / Cypher traversal (Neo4j).
+    Uses networkx simple_cycles at load time (mock) / Cypher traversal (Neo4j).
     """
-    return detect_circular_trading()
+    return await asyncio.to_thread(detect_circular_trading)
 
 
 @router.get("/suspicious-clusters")
-def suspicious_clusters():
+@ttl_cache(expire=30, etag=True)
+async def suspicious_clusters():
     """
     Identify suspicious vendor clusters using degree centrality.
     Production: Neo4j GDS Louvain community detection algorithm.
     """
-    return detect_suspicious_clusters()
+    return await asyncio.to_thread(detect_suspicious_clusters)
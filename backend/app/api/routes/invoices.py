@@ -1,28 +1,47 @@
 """Invoice reconciliation endpoints."""
+import asyncio
+from typing import Iterator, Optional
+
+import orjson
 from fastapi import APIRouter, Query
-from typing import Optional
-from app.services.reconciliation_engine import reconcile_all_invoices, reconcile_invoice
+from fastapi.responses import StreamingResponse
+from app.services.mock_data import Invoice, store
+from app.services.reconciliation_engine import invoice_row, reconcile_invoice, select_invoices
 
 router = APIRouter()
 
 
+def _stream_invoice_list(invoices: list[Invoice]) -> Iterator[bytes]:
+    """Encode the list payload row by row so peak memory is one rendered invoice, not the page."""
+    yield b'{"total":%d,"filtered":%d,"invoices":[' % (len(store.invoices), len(invoices))
+    for n, inv in enumerate(invoices):
+        if n:
+            yield b","
+        yield orjson.dumps(invoice_row(inv))
+    yield b"]}"
+
+
 @router.get("")
-def list_invoices(
+async def list_invoices(
     risk: Optional[str] = Query(None, description="Filter by risk category: LOW|MEDIUM|HIGH|CRITICAL"),
     vendor: Optional[str] = Query(None, description="Filter by vendor ID e.g. V001"),
-    limit: int = Query(100, le=100),
+    limit: int = Query(100, ge=0, le=100),
 ):
     """
     List all invoices with reconciliation status and risk scores.
     Supports filtering by risk category and vendor.
     """
-    return reconcile_all_invoices(limit=limit, risk_filter=risk, vendor_filter=vendor)
+    invoices = select_invoices(limit=limit, risk_filter=risk, vendor_filter=vendor)
+    return StreamingResponse(_stream_invoice_list(invoices), media_type="application/json")
 
 
 @router.get("/{invoice_id}")
-def get_invoice(invoice_id: str):
+async def get_invoice(
+    invoice_id: str,
+    verbose: bool = Query(False, description="Include each hop's Cypher pattern and detail text"),
+):
     """
     Full multi-hop reconciliation report for a single invoice.
     Returns hop-by-hop traversal result + explainable audit report.
     """
-    return reconcile_invoice(invoice_id)
+    return await asyncio.to_thread(reconcile_invoice, invoice_id, verbose)
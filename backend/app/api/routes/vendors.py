@@ -1,38 +1,39 @@
 """Vendor intelligence endpoints."""
+import asyncio
+
 from fastapi import APIRouter
+from app.core.cache import ttl_cache
 from app.services.risk_engine import get_all_vendor_risk_profiles, compute_vendor_risk_profile
 from app.services.mock_data import store
 
 router = APIRouter()
 
+_INVOICE_SUMMARY_FIELDS = (
+    "invoice_id", "invoice_date", "period", "total_gst",
+    "status", "risk_category", "risk_score",
+)
+
 
 @router.get("")
-def list_vendors():
+@ttl_cache(expire=30, etag=True)
+async def list_vendors():
     """List all vendors with compliance scores and risk profiles."""
-    return get_all_vendor_risk_profiles()
+    return await asyncio.to_thread(get_all_vendor_risk_profiles)
 
 
 @router.get("/{vendor_id}")
-def get_vendor(vendor_id: str):
+async def get_vendor(vendor_id: str):
     """
     Full vendor risk profile: compliance score, filing behavior,
     invoice statistics, risk flags, and at-risk ITC exposure.
     """
-    store.initialize()
+    return await asyncio.to_thread(_build_vendor_profile, vendor_id)
+
+
+def _build_vendor_profile(vendor_id: str) -> dict:
     profile  = compute_vendor_risk_profile(vendor_id)
     invoices = store.get_invoices_for_vendor(vendor_id)
 
-    # Attach invoice summary
-    profile["invoices"] = [
-        {
-            "invoice_id":    i["invoice_id"],
-            "invoice_date":  i["invoice_date"],
-            "period":        i["period"],
-            "total_gst":     i["total_gst"],
-            "status":        i["status"],
-            "risk_category": i["risk_category"],
-            "risk_score":    i["risk_score"],
-        }
-        for i in sorted(invoices, key=lambda x: x["risk_score"], reverse=True)
-    ]
+    # Attach invoice summary (the vendor index is already highest-risk first)
+    profile["invoices"] = [{k: getattr(i, k) for k in _INVOICE_SUMMARY_FIELDS} for i in invoices]
     return profile
@@ -0,0 +1,84 @@
+"""
+GraphLedger AI — In-Process Response Cache
+============================================
+Tiny TTL cache for the read-only aggregate endpoints.
+
+The mock knowledge graph is static after startup, so dashboard, fraud
+and vendor-list responses are identical between requests. Caching the
+built payload turns every hit after the first into a dict lookup.
+
+Scalability note: In production (multiple uvicorn workers / pods), swap
+this for Redis so every worker shares one cache and one invalidation.
+"""
+
+import inspect
+import time
+from functools import wraps
+
+from fastapi.responses import ORJSONResponse, Response
+
+from app.core.http_cache import weak_etag
+
+_registry: list[dict] = []
+_MISS = object()
+
+
+def ttl_cache(expire: int = 30, etag: bool = False):
+    """
+    Cache a function's return value for `expire` seconds, keyed on its arguments.
+    Works on both plain and `async def` handlers (the awaited result is cached).
+    These endpoints are unauthenticated global aggregates, so no per-user key is needed.
+
+    With `etag=True` the value is JSON-encoded and hashed once per entry; every
+    hit returns the stored bytes with their ETag, so etag_middleware neither
+    re-encodes nor re-hashes the body.
+    """
+    def decorator(fn):
+        entries: dict = {}
+        _registry.append(entries)
+
+        def lookup(key, now):
+            hit = entries.get(key)
+            return hit[1] if hit is not None and hit[0] > now else _MISS
+
+        def store(key, now, value):
+            if etag:
+                body = ORJSONResponse(value).body
+                value = (body, weak_etag(body))
+            entries[key] = (now + expire, value)
+            return value
+
+        def respond(value):
+            if not etag:
+                return value
+            body, tag = value
+            return Response(content=body, media_type="application/json", headers={"ETag": tag})
+
+        if inspect.iscoroutinefunction(fn):
+            @wraps(fn)
+            async def wrapper(*args, **kwargs):
+                key = (args, tuple(sorted(kwargs.items())))
+                now = time.monotonic()
+                value = lookup(key, now)
+                if value is _MISS:
+                    value = store(key, now, await fn(*args, **kwargs))
+                return respond(value)
+        else:
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                key = (args, tuple(sorted(kwargs.items())))
+                now = time.monotonic()
+                value = lookup(key, now)
+                if value is _MISS:
+                    value = store(key, now, fn(*args, **kwargs))
+                return respond(value)
+
+        wrapper.cache_clear = entries.clear
+        return wrapper
+    return decorator
+
+
+def clear_all() -> None:
+    """Drop every cached response (call from any endpoint that mutates the store)."""
+    for entries in _registry:
+        entries.clear()
@@ -0,0 +1,59 @@
+"""
+GraphLedger AI — HTTP Caching Headers
+======================================
+Adds ETag + Cache-Control to slow-changing GET endpoints so browsers and
+reverse proxies (nginx, CloudFront) can revalidate instead of refetching.
+A matching If-None-Match short-circuits to an empty 304.
+
+Tags are weak (W/"…"): GZipMiddleware sits outside this middleware, so one
+tag covers both the gzip and identity encodings of the same JSON.
+Endpoints behind `ttl_cache(etag=True)` arrive with their tag already set,
+computed once per cache entry; anything else is buffered and hashed here.
+"""
+
+import hashlib
+
+from fastapi import Request, Response
+
+# Mock data / daily GST cycles — a minute fresh, five minutes stale is safe
+CACHE_CONTROL = "public, max-age=60, stale-while-revalidate=300"
+CACHEABLE_PREFIXES = ("/dashboard", "/fraud", "/vendors")
+
+
+def weak_etag(body: bytes) -> str:
+    return f'W/"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+
+
+def _etag_matches(etag: str, if_none_match: str) -> bool:
+    """RFC 9110 weak comparison: `*` or any listed tag equal once W/ is dropped."""
+    opaque = etag.removeprefix("W/")
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == opaque:
+            return True
+    return False
+
+
+async def etag_middleware(request: Request, call_next):
+    response = await call_next(request)
+    if (request.method != "GET" or response.status_code != 200
+            or not request.url.path.startswith(CACHEABLE_PREFIXES)):
+        return response
+
+    etag = response.headers.get("etag")
+    if etag is None:
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        etag = weak_etag(body)
+        response = Response(content=body, status_code=response.status_code,
+                            headers={k: v for k, v in response.headers.items()
+                                     if k.lower() != "content-length"},
+                            media_type=response.media_type)
+        response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+    if _etag_matches(etag, request.headers.get("if-none-match", "")):
+        # The 200 may be gzipped by the outer middleware, so the 304 says so too
+        return Response(status_code=304, headers={
+            "ETag": etag, "Cache-Control": CACHE_CONTROL, "Vary": "Accept-Encoding",
+        })
+    return response
@@ -24,8 +24,14 @@ GST BACKGROUND (for newcomers):
 
 import random
 import hashlib
-from datetime import datetime, timedelta
-from typing import Any
+import networkx as nx
+import orjson
+from bisect import bisect_right
+from dataclasses import asdict, dataclass
+from enum import IntEnum
+from typing import Any, Callable
+
+from app.services.audit_engine import count_findings
 
 random.seed(42)  # Reproducible data for demos
 
@@ -37,9 +43,49 @@ STATES = {
     "09": "Uttar Pradesh", "19": "West Bengal", "36": "Telangana",
     "32": "Kerala",
 }
-PERIODS = ["2024-07", "2024-08", "2024-09", "2024-10", "2024-11", "2024-12"]
+PERIODS = ("2024-07", "2024-08", "2024-09", "2024-10", "2024-11", "2024-12")
+GST_RATES = (0.05, 0.12, 0.18, 0.28)
+# Taxable value tiers (₹): small, mid, large
+AMOUNT_TIERS = ((10_000, 50_000), (50_000, 2_00_000), (2_00_000, 10_00_000))
+DAYS_IN_MONTH = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
 BUYER_GSTIN = "27AABCM1234A1Z5"  # Taxpayer's GSTIN
 
+# Per-period calendar facts, computed once: GSTR-1 due on the 11th and GSTR-3B on
+# the 20th of the following month
+_PERIOD_META: dict[str, dict] = {}
+for _p in PERIODS:
+    _y, _m = map(int, _p.split("-"))
+    _ny, _nm = (_y, _m + 1) if _m < 12 else (_y + 1, 1)
+    _PERIOD_META[_p] = {
+        "year":        _y,
+        "month":       _m,
+        "days":        DAYS_IN_MONTH[_m - 1],
+        "gstr1_month": f"{_ny}-{_nm:02d}",
+        "gstr2b_date": f"{_y}-{_m:02d}-14",
+        "gstr3b_due":  f"{_ny}-{_nm:02d}-20",
+    }
+del _p, _y, _m, _ny, _nm
+
+# Compliance flag bits packed into each invoice's `flags` (the bool keys are kept too)
+IRN_VALID       = 1
+IN_GSTR2B       = 2
+VENDOR_FILED    = 4
+TAX_PAID        = 8
+AMOUNT_MISMATCH = 16
+CIRCULAR_TRADE  = 32
+
+
+class RiskLevel(IntEnum):
+    """Invoice risk category as stored in `risk_category_id`; ordered, so `>= HIGH` works."""
+    LOW      = 0
+    MEDIUM   = 1
+    HIGH     = 2
+    CRITICAL = 3
+
+
+# Category names indexed by `risk_category_id`
+RISK_CATEGORIES = tuple(level.name for level in RiskLevel)
+
 
 def _make_gstin(state_code: str, pan_suffix: str) -> str:
     """Generate a realistic-looking GSTIN. Format: SS + 10-char-PAN + 1 + Z + C"""
@@ -47,18 +93,22 @@ def _make_gstin(state_code: str, pan_suffix: str) -> str:
     return f"{state_code}{pan}1Z{random.choice('0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ')}"
 
 
-def _make_irn(invoice_id: str, vendor_gstin: str, date: str) -> str:
+def _irn_prefix(vendor_gstin: str) -> "hashlib._Hash":
+    """SHA-256 state after hashing the per-vendor `seller_gstin + doc_type` prefix."""
+    return hashlib.sha256(f"{vendor_gstin}INV".encode())
+
+
+def _make_irn(invoice_id: str, prefix: "hashlib._Hash", date: str) -> str:
     """IRN is a 64-char SHA-256 hash of: seller_gstin + doc_type + doc_number + doc_date"""
-    raw = f"{vendor_gstin}INV{invoice_id}{date}"
-    return hashlib.sha256(raw.encode()).hexdigest()
+    h = prefix.copy()  # resume from the vendor prefix instead of re-hashing it
+    h.update(f"{invoice_id}{date}".encode())
+    return h.digest().hex()
 
 
 def _random_date(period: str) -> str:
     """Random date within a given YYYY-MM period."""
-    year, month = map(int, period.split("-"))
-    days_in_month = 28 if month == 2 else 30 if month in [4, 6, 9, 11] else 31
-    day = random.randint(1, days_in_month)
-    return f"{year}-{month:02d}-{day:02d}"
+    meta = _PERIOD_META[period]
+    return f"{meta['year']}-{meta['month']:02d}-{random.randint(1, meta['days']):02d}"
 
 
 # ─── Vendor Profiles ─────────────────────────────────────────
@@ -97,11 +147,13 @@ COMPLIANCE_CONFIG = {
 }
 
 
+# Vendor compliance-score cut points → category, lowest band first
+_VENDOR_SCORE_CUTS = (0.25, 0.50, 0.75)
+_VENDOR_RISK_BANDS = ("CRITICAL", "HIGH", "MEDIUM", "LOW")
+
+
 def _vendor_risk_category(score: float) -> str:
-    if score >= 0.75: return "LOW"
-    if score >= 0.50: return "MEDIUM"
-    if score >= 0.25: return "HIGH"
-    return "CRITICAL"
+    return _VENDOR_RISK_BANDS[bisect_right(_VENDOR_SCORE_CUTS, score)]
 
 
 def generate_vendors() -> list[dict]:
@@ -143,13 +195,26 @@ def generate_taxpayer() -> dict:
     }
 
 
-def _compute_risk_score(
-    irn_valid: bool, in_2b: bool, vendor_filed: bool,
-    tax_paid: bool, amount_mismatch: bool, vendor_score: float
-) -> tuple[int, str, list[str]]:
+# (weight, reason) per failed check, in flag-bit order (IRN_VALID … AMOUNT_MISMATCH)
+_RISK_RULES = (
+    (40, "IRN validation failed — e-invoice mandate violation"),
+    (30, "Invoice not reflected in GSTR-2B — ITC disallowance risk"),
+    (35, "Vendor has not filed GSTR-1 — GST not deposited upstream"),
+    (35, "Tax payment not confirmed — circular ITC chain broken"),
+    (20, "Invoice amount mismatch between GSTR-1 and GSTR-2B"),
+)
+# All 32 flag combinations scored once at import: key → (score, reasons)
+_RULE_TABLE = tuple(
+    (sum(w for bit, (w, _) in enumerate(_RISK_RULES) if key >> bit & 1),
+     tuple(r for bit, (_, r) in enumerate(_RISK_RULES) if key >> bit & 1))
+    for key in range(1 << len(_RISK_RULES))
+)
+
+
+def _compute_risk_score(flags: int, vendor_score: float) -> tuple[int, int, list[str]]:
     """
     Rule-based risk scoring engine.
-    Returns (score: 0-100, category: str, reasons: list[str])
+    Returns (score: 0-100, category_id: index into RISK_CATEGORIES, reasons: list[str])
 
     Scoring weights (designed to reflect real GST audit risk):
       IRN invalid       → +40  (e-invoice mandate violation)
@@ -159,24 +224,10 @@ def _compute_risk_score(
       Amount mismatch   → +20  (reconciliation gap)
       Vendor score adj. → up to +10 (penalty for chronic offenders)
     """
-    score = 0
-    reasons = []
-
-    if not irn_valid:
-        score += 40
-        reasons.append("IRN validation failed — e-invoice mandate violation")
-    if not in_2b:
-        score += 30
-        reasons.append("Invoice not reflected in GSTR-2B — ITC disallowance risk")
-    if not vendor_filed:
-        score += 35
-        reasons.append("Vendor has not filed GSTR-1 — GST not deposited upstream")
-    if not tax_paid:
-        score += 35
-        reasons.append("Tax payment not confirmed — circular ITC chain broken")
-    if amount_mismatch:
-        score += 20
-        reasons.append("Invoice amount mismatch between GSTR-1 and GSTR-2B")
+    # Failed checks as a 5-bit key: invert the four "passed" bits, keep the mismatch bit
+    key = (flags ^ (IRN_VALID | IN_GSTR2B | VENDOR_FILED | TAX_PAID)) & (len(_RULE_TABLE) - 1)
+    score, base_reasons = _RULE_TABLE[key]
+    reasons = list(base_reasons)
 
     # Chronic bad vendor penalty
     if vendor_score < 0.30:
@@ -184,20 +235,53 @@ def _compute_risk_score(
         reasons.append(f"Vendor compliance score critically low ({vendor_score:.2f})")
 
     score = min(score, 100)
+    cat_id = 0 if score < 20 else 1 if score < 45 else 2 if score < 70 else 3
 
-    if score >= 70:
-        category = "CRITICAL"
-    elif score >= 45:
-        category = "HIGH"
-    elif score >= 20:
-        category = "MEDIUM"
-    else:
-        category = "LOW"
+    return score, cat_id, reasons
 
-    return score, category, reasons
 
-
-def generate_invoices(vendors: list[dict]) -> list[dict]:
+@dataclass(slots=True)
+class Invoice:
+    """
+    One purchase invoice node. Slotted record rather than a dict: fields sit at
+    fixed offsets, so hot aggregation loops do attribute loads, not hash lookups.
+    """
+    invoice_id:        str
+    invoice_number:    str
+    invoice_date:      str
+    period:            str
+    vendor_id:         str
+    vendor_gstin:      str
+    vendor_name:       str
+    vendor_score:      float
+    vendor_tier:       str
+    taxable_amount:    int
+    gst_rate:          int
+    cgst:              int
+    sgst:              int
+    igst:              int
+    total_gst:         int
+    total_amount:      int
+    is_interstate:     bool
+    irn_number:        str | None
+    irn_valid:         bool
+    in_gstr2b:         bool
+    vendor_filed:      bool
+    tax_paid:          bool
+    amount_mismatch:   bool
+    flags:             int
+    status:            str
+    risk_score:        int
+    risk_category:     str
+    risk_category_id:  int
+    risk_reasons:      list[str]
+    is_circular_trade: bool
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def generate_invoices(vendors: list[dict]) -> list[Invoice]:
     """
     Generate 100 invoices with realistic mismatch distribution:
       ~70% CLEAN invoices
@@ -208,41 +292,43 @@ def generate_invoices(vendors: list[dict]) -> list[dict]:
     Circular trading invoices: 5 invoices among V018/V019/V020
     """
     invoices = []
-    vendor_map = {v["vendor_id"]: v for v in vendors}
+    # Vendor id → position, plus per-vendor compliance probabilities as parallel lists
+    vendor_idx  = {v["vendor_id"]: k for k, v in enumerate(vendors)}
+    irn_pct     = [v["irn_valid_pct"] for v in vendors]
+    in_2b_pct   = [v["in_2b_pct"] for v in vendors]
+    filing_pct  = [v["filing_pct"] for v in vendors]
+    paid_pct    = [v["paid_pct"] for v in vendors]
+    irn_prefixes: dict[str, "hashlib._Hash"] = {}
 
     # Assign invoice counts per vendor (total = 100)
     invoice_assignments = []
     # Circular trading vendors get 5 invoices total
     circular_vendors = ["V018", "V019", "V020"]
-    for vid in circular_vendors:
-        count = random.randint(1, 2)
+    for vid, count in zip(circular_vendors, random.choices((1, 2), k=len(circular_vendors))):
         invoice_assignments.extend([vid] * count)
 
     # Remaining 95 across other vendors
     other_vendors = [v["vendor_id"] for v in vendors if v["vendor_id"] not in circular_vendors]
-    while len(invoice_assignments) < 100:
-        invoice_assignments.append(random.choice(other_vendors))
+    invoice_assignments.extend(random.choices(other_vendors, k=100 - len(invoice_assignments)))
     random.shuffle(invoice_assignments)
     invoice_assignments = invoice_assignments[:100]
 
     for idx, vendor_id in enumerate(invoice_assignments, 1):
-        vendor = vendor_map[vendor_id]
+        k = vendor_idx[vendor_id]
+        vendor = vendors[k]
         period = random.choice(PERIODS)
         inv_date = _random_date(period)
-        base_amount = random.choice([
-            random.randint(10_000, 50_000),
-            random.randint(50_000, 2_00_000),
-            random.randint(2_00_000, 10_00_000),
-        ])
-        gst_rate = random.choice([0.05, 0.12, 0.18, 0.28])
+        lo, hi = AMOUNT_TIERS[random.randint(0, 2)]
+        base_amount = random.randint(lo, hi)
+        gst_rate = random.choice(GST_RATES)
         gst_amount = round(base_amount * gst_rate)
         is_interstate = vendor["state_code"] != "27"  # buyer is Maharashtra (27)
 
         # Probabilistic compliance flags based on vendor tier
-        irn_valid    = random.random() < vendor["irn_valid_pct"]
-        in_2b        = irn_valid and (random.random() < vendor["in_2b_pct"])
-        vendor_filed = random.random() < vendor["filing_pct"]
-        tax_paid     = vendor_filed and (random.random() < vendor["paid_pct"])
+        irn_valid    = random.random() < irn_pct[k]
+        in_2b        = irn_valid and (random.random() < in_2b_pct[k])
+        vendor_filed = random.random() < filing_pct[k]
+        tax_paid     = vendor_filed and (random.random() < paid_pct[k])
         amount_mismatch = (not in_2b) and (random.random() < 0.3)
 
         # Circular trading vendors: override flags to be mostly invalid
@@ -253,79 +339,96 @@ def generate_invoices(vendors: list[dict]) -> list[dict]:
             tax_paid        = False
             amount_mismatch = True
 
-        risk_score, risk_category, risk_reasons = _compute_risk_score(
-            irn_valid, in_2b, vendor_filed, tax_paid,
-            amount_mismatch, vendor["compliance_score"]
+        is_circular = vendor_id in circular_vendors
+        flags = (irn_valid * IRN_VALID | in_2b * IN_GSTR2B | vendor_filed * VENDOR_FILED
+                 | tax_paid * TAX_PAID | amount_mismatch * AMOUNT_MISMATCH
+                 | is_circular * CIRCULAR_TRADE)
+        risk_score, risk_category_id, risk_reasons = _compute_risk_score(
+            flags, vendor["compliance_score"]
         )
 
         # Determine reconciliation status
-        if risk_category == "LOW":
+        if risk_category_id == RiskLevel.LOW:
             status = "MATCHED"
-        elif risk_category == "MEDIUM":
+        elif risk_category_id == RiskLevel.MEDIUM:
             status = "PARTIAL_MATCH"
         else:
             status = "MISMATCHED"
 
         invoice_id  = f"INV-{idx:03d}"
         inv_number  = f"{vendor_id}/2024/{idx:04d}"
-        irn_number  = _make_irn(invoice_id, vendor["gstin"], inv_date) if irn_valid else None
-
-        invoices.append({
-            "invoice_id":       invoice_id,
-            "invoice_number":   inv_number,
-            "invoice_date":     inv_date,
-            "period":           period,
-            "vendor_id":        vendor_id,
-            "vendor_gstin":     vendor["gstin"],
-            "vendor_name":      vendor["name"],
-            "vendor_score":     vendor["compliance_score"],
-            "vendor_tier":      vendor["compliance_tier"],
-            "taxable_amount":   base_amount,
-            "gst_rate":         int(gst_rate * 100),
-            "cgst":             0 if is_interstate else gst_amount // 2,
-            "sgst":             0 if is_interstate else gst_amount // 2,
-            "igst":             gst_amount if is_interstate else 0,
-            "total_gst":        gst_amount,
-            "total_amount":     base_amount + gst_amount,
-            "is_interstate":    is_interstate,
-            "irn_number":       irn_number,
-            "irn_valid":        irn_valid,
-            "in_gstr2b":        in_2b,
-            "vendor_filed":     vendor_filed,
-            "tax_paid":         tax_paid,
-            "amount_mismatch":  amount_mismatch,
-            "status":           status,
-            "risk_score":       risk_score,
-            "risk_category":    risk_category,
-            "risk_reasons":     risk_reasons,
-            "is_circular_trade": vendor_id in circular_vendors,
-        })
+        if irn_valid:
+            prefix = irn_prefixes.get(vendor_id)
+            if prefix is None:
+                prefix = irn_prefixes[vendor_id] = _irn_prefix(vendor["gstin"])
+            irn_number = _make_irn(invoice_id, prefix, inv_date)
+        else:
+            irn_number = None
+
+        invoices.append(Invoice(
+            invoice_id=invoice_id,
+            invoice_number=inv_number,
+            invoice_date=inv_date,
+            period=period,
+            vendor_id=vendor_id,
+            vendor_gstin=vendor["gstin"],
+            vendor_name=vendor["name"],
+            vendor_score=vendor["compliance_score"],
+            vendor_tier=vendor["compliance_tier"],
+            taxable_amount=base_amount,
+            gst_rate=int(gst_rate * 100),
+            cgst=0 if is_interstate else gst_amount // 2,
+            sgst=0 if is_interstate else gst_amount // 2,
+            igst=gst_amount if is_interstate else 0,
+            total_gst=gst_amount,
+            total_amount=base_amount + gst_amount,
+            is_interstate=is_interstate,
+            irn_number=irn_number,
+            irn_valid=irn_valid,
+            in_gstr2b=in_2b,
+            vendor_filed=vendor_filed,
+            tax_paid=tax_paid,
+            amount_mismatch=amount_mismatch,
+            flags=flags,
+            status=status,
+            risk_score=risk_score,
+            risk_category=RISK_CATEGORIES[risk_category_id],
+            risk_category_id=risk_category_id,
+            risk_reasons=risk_reasons,
+            is_circular_trade=is_circular,
+        ))
 
     return invoices
 
 
-def generate_gstr_returns(vendors: list[dict], invoices: list[dict]) -> dict:
+def generate_gstr_returns(vendors: list[dict], invoices: list[Invoice]) -> dict:
     """Generate GSTR-1 (vendor), GSTR-2B (buyer auto), GSTR-3B (buyer filed)"""
     vendor_map = {v["vendor_id"]: v for v in vendors}
 
+    # Single group-by pass: (vendor_id, period) → invoices, plus per-period GSTR-2B totals
+    by_vendor_period: dict[tuple[str, str], list[Invoice]] = {}
+    in_2b_count = dict.fromkeys(PERIODS, 0)
+    in_2b_gst   = dict.fromkeys(PERIODS, 0)
+    for inv in invoices:
+        by_vendor_period.setdefault((inv.vendor_id, inv.period), []).append(inv)
+        if inv.in_gstr2b:
+            in_2b_count[inv.period] += 1
+            in_2b_gst[inv.period]   += inv.total_gst
+
     gstr1_records = []
     for period in PERIODS:
+        # Filing date = 11th of next month (due date for GSTR-1)
+        due_month = _PERIOD_META[period]["gstr1_month"]
         for vendor in vendors:
-            period_invoices = [i for i in invoices
-                               if i["vendor_id"] == vendor["vendor_id"] and i["period"] == period]
+            period_invoices = by_vendor_period.get((vendor["vendor_id"], period))
             if not period_invoices:
                 continue
             filed = vendor["filing_pct"] > 0.5 and random.random() < vendor["filing_pct"]
-            # Filing date = 11th of next month (due date for GSTR-1)
-            year, month = map(int, period.split("-"))
-            next_month = month + 1 if month < 12 else 1
-            next_year  = year if month < 12 else year + 1
-            due_date   = f"{next_year}-{next_month:02d}-11"
             late_days  = random.randint(0, 15) if not filed else 0
             filing_date = None
             if filed:
-                base = datetime.strptime(due_date, "%Y-%m-%d")
-                filing_date = (base + timedelta(days=late_days)).strftime("%Y-%m-%d")
+                # late_days ≤ 15, so the 11th + late_days never runs past the 28th
+                filing_date = f"{due_month}-{11 + late_days:02d}"
 
             gstr1_records.append({
                 "gstr1_id":     f"GSTR1-{vendor['vendor_id']}-{period}",
@@ -335,34 +438,28 @@ def generate_gstr_returns(vendors: list[dict], invoices: list[dict]) -> dict:
                 "filing_date":  filing_date,
                 "filed":        filed,
                 "invoice_count":len(period_invoices),
-                "total_tax_value": sum(i["total_gst"] for i in period_invoices),
+                "total_tax_value": sum(i.total_gst for i in period_invoices),
             })
 
     # GSTR-2B: auto-populated for buyer (only invoices in 2B)
     gstr2b_records = []
     for period in PERIODS:
-        in_2b_invoices = [i for i in invoices
-                          if i["period"] == period and i["in_gstr2b"]]
         gstr2b_records.append({
             "gstr2b_id":       f"GSTR2B-BUYER-{period}",
             "period":          period,
-            "generated_date":  f"{period[:4]}-{int(period[5:]):02d}-14",  # 14th of next month
-            "invoice_count":   len(in_2b_invoices),
-            "total_itc_available": sum(i["total_gst"] for i in in_2b_invoices),
+            "generated_date":  _PERIOD_META[period]["gstr2b_date"],
+            "invoice_count":   in_2b_count[period],
+            "total_itc_available": in_2b_gst[period],
         })
 
     # GSTR-3B: filed by buyer
     gstr3b_records = []
     for period in PERIODS:
-        period_invoices = [i for i in invoices if i["period"] == period]
-        itc_claimed = sum(i["total_gst"] for i in period_invoices if i["in_gstr2b"])
-        year, month = map(int, period.split("-"))
-        next_month = month + 1 if month < 12 else 1
-        next_year  = year if month < 12 else year + 1
+        itc_claimed = in_2b_gst[period]
         gstr3b_records.append({
             "gstr3b_id":   f"GSTR3B-BUYER-{period}",
             "period":      period,
-            "filing_date": f"{next_year}-{next_month:02d}-20",
+            "filing_date": _PERIOD_META[period]["gstr3b_due"],
             "filed":       True,
             "itc_claimed": itc_claimed,
             "tax_paid":    max(0, itc_claimed - random.randint(100_000, 500_000)),
@@ -414,18 +511,16 @@ class MockDataStore:
     The graph structure here mirrors exactly what would exist in Neo4j,
     making the migration from mock → real a repository-layer swap only.
     """
-    _instance = None
 
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._instance._initialized = False
-        return cls._instance
+    def __init__(self):
+        self._initialized = False
 
     def initialize(self):
+        """Generate the demo dataset. Called once from the FastAPI startup hook."""
         if self._initialized:
             return
         self.taxpayer   = generate_taxpayer()
+        self.taxpayer_json = orjson.dumps(self.taxpayer)  # immutable — encode once, serve as bytes
         self.vendors    = generate_vendors()
         self.invoices   = generate_invoices(self.vendors)
         returns         = generate_gstr_returns(self.vendors, self.invoices)
@@ -433,27 +528,160 @@ class MockDataStore:
         self.gstr2b     = returns["gstr2b"]
         self.gstr3b     = returns["gstr3b"]
         self.circular_links = generate_circular_trading_links(self.vendors)
-        self._initialized = True
+        self._build_indexes()
+        self._refresh_aggregates()
+        self._initialized = True  # last — /health reports data_loaded only once aggregates exist
         print(f"[MockDataStore] Loaded: {len(self.vendors)} vendors, "
               f"{len(self.invoices)} invoices, {len(self.gstr1)} GSTR-1 records")
 
+    def _build_indexes(self):
+        """Build O(1) lookup indexes from the generated data."""
+        self._vendor_by_id:  dict[str, dict]       = {v["vendor_id"]: v for v in self.vendors}
+        self._invoice_by_id: dict[str, Invoice]    = {i.invoice_id: i for i in self.invoices}
+        # Buckets are filled in descending risk-score order (stable), so every
+        # index is already "most at-risk first" and list endpoints can stop at `limit`
+        self._inv_by_score:  list[Invoice]         = sorted(
+            self.invoices, key=lambda x: x.risk_score, reverse=True,
+        )
+        self._inv_by_vendor: dict[str, list[Invoice]] = {}
+        self._inv_by_risk:   dict[str, list[Invoice]] = {}
+        for inv in self._inv_by_score:
+            self._inv_by_vendor.setdefault(inv.vendor_id, []).append(inv)
+            self._inv_by_risk.setdefault(inv.risk_category, []).append(inv)
+
+        # Vendor transaction graph (TRANSACTS_WITH) for cycle / community detection
+        self.transaction_graph = nx.DiGraph()
+        for link in self.circular_links:
+            self.transaction_graph.add_edge(
+                link["from_vendor_id"], link["to_vendor_id"],
+                transaction_count=link["transaction_count"],
+                total_value=link["total_value"],
+            )
+
+    def _refresh_aggregates(self):
+        """
+        Denormalize the dashboard aggregates once instead of rescanning
+        every invoice per /summary request.
+        """
+        self._summary = self._compute_dashboard_summary()
+        self._dist, self._trend = self._compute_distribution_and_trend()
+        # Engine-built memos, filled on first use via the get_* methods below
+        # (risk_engine / reconciliation_engine import this module, so they pass the builder in)
+        self._risk_summary     = None
+        self._recon_by_invoice = None
+        self._vendor_profiles  = None
+
+        # Circular-trading ring: static after load, so the fraud endpoints only assemble dicts
+        ring_vendor_ids = set()
+        for link in self.circular_links:
+            ring_vendor_ids.add(link["from_vendor_id"])
+            ring_vendor_ids.add(link["to_vendor_id"])
+        self._ring_vendor_ids    = frozenset(ring_vendor_ids)
+        self._ring_vendors       = [self._vendor_by_id.get(vid) for vid in self._ring_vendor_ids]
+        self._ring_cycles        = list(nx.simple_cycles(self.transaction_graph))
+        # Louvain community per vendor (seeded so cluster ids are stable across restarts)
+        communities = nx.community.louvain_communities(
+            self.transaction_graph.to_undirected(), weight="total_value", seed=42,
+        )
+        self._community_of = {vid: idx for idx, members in enumerate(communities, 1) for vid in members}
+        self._ring_itc_total     = sum(
+            inv.total_gst for inv in self.invoices if inv.vendor_id in self._ring_vendor_ids
+        )
+
+        # One entry per detected cycle: members in cycle order, the links closing it, its exposure
+        link_by_edge = {(l["from_vendor_id"], l["to_vendor_id"]): l for l in self.circular_links}
+        self._rings = []
+        for cycle in self._ring_cycles:
+            members = frozenset(cycle)
+            ring_invoices = [inv for inv in self.invoices if inv.vendor_id in members]
+            links = [link_by_edge[(vid, cycle[(k + 1) % len(cycle)])] for k, vid in enumerate(cycle)]
+            self._rings.append({
+                "vendors":        [self._vendor_by_id[vid] for vid in cycle if vid in self._vendor_by_id],
+                "links":          links,
+                "circular_value": sum(link["total_value"] for link in links),
+                "invoice_count":  len(ring_invoices),
+                "itc_total":      sum(inv.total_gst for inv in ring_invoices),
+            })
+        self.suspicious_vendor_count = sum(1 for v in self._ring_vendors if v)
+        self.circular_itc_total = sum(
+            i.total_gst for i in self.invoices if i.is_circular_trade
+        )
+
+        # Rule evaluation is static per invoice — run it once here, not per /invoices request
+        self._finding_counts = {i.invoice_id: count_findings(i) for i in self.invoices}
+
     def get_vendor_by_id(self, vendor_id: str) -> dict | None:
-        return next((v for v in self.vendors if v["vendor_id"] == vendor_id), None)
+        return self._vendor_by_id.get(vendor_id)
+
+    def get_invoice_by_id(self, invoice_id: str) -> Invoice | None:
+        return self._invoice_by_id.get(invoice_id)
+
+    def get_invoices_for_vendor(self, vendor_id: str) -> list[Invoice]:
+        return self._inv_by_vendor.get(vendor_id, [])
 
-    def get_invoice_by_id(self, invoice_id: str) -> dict | None:
-        return next((i for i in self.invoices if i["invoice_id"] == invoice_id), None)
+    def get_invoices_by_score(self) -> list[Invoice]:
+        """All invoices, highest risk score first."""
+        return self._inv_by_score
 
-    def get_invoices_for_vendor(self, vendor_id: str) -> list[dict]:
-        return [i for i in self.invoices if i["vendor_id"] == vendor_id]
+    def get_invoices_by_risk(self, risk_category: str) -> list[Invoice]:
+        return self._inv_by_risk.get(risk_category, [])
+
+    def get_finding_count(self, invoice_id: str) -> int:
+        return self._finding_counts[invoice_id]
 
     def get_dashboard_summary(self) -> dict:
-        total_itc       = sum(i["total_gst"] for i in self.invoices)
-        clean_itc       = sum(i["total_gst"] for i in self.invoices if i["risk_category"] == "LOW")
-        medium_itc      = sum(i["total_gst"] for i in self.invoices if i["risk_category"] == "MEDIUM")
-        high_itc        = sum(i["total_gst"] for i in self.invoices if i["risk_category"] == "HIGH")
-        critical_itc    = sum(i["total_gst"] for i in self.invoices if i["risk_category"] == "CRITICAL")
-        mismatched      = sum(1 for i in self.invoices if i["status"] == "MISMATCHED")
-        matched         = sum(1 for i in self.invoices if i["status"] == "MATCHED")
+        return self._summary
+
+    def get_vendor_profiles(self, build: Callable[[], list[dict]]) -> list[dict]:
+        """Vendor risk profiles, least compliant first; `build` runs once per refresh."""
+        if self._vendor_profiles is None:
+            self._vendor_profiles = build()
+        return self._vendor_profiles
+
+    def get_risk_summary(self, build: Callable[[], dict]) -> dict:
+        """Portfolio risk summary; `build` runs once per refresh."""
+        if self._risk_summary is None:
+            self._risk_summary = build()
+        return self._risk_summary
+
+    def get_reconciliations(self, build: Callable[[], dict[str, dict]]) -> dict[str, dict]:
+        """invoice_id → compact reconciliation result; `build` runs once per refresh."""
+        if self._recon_by_invoice is None:
+            self._recon_by_invoice = build()
+        return self._recon_by_invoice
+
+    def get_ring_cycles(self) -> list[list[str]]:
+        """Vendor-id cycles in the transaction graph."""
+        return self._ring_cycles
+
+    def get_rings(self) -> list[dict]:
+        """One entry per cycle: vendors, links, circular_value, invoice_count, itc_total."""
+        return self._rings
+
+    def get_ring_vendor_ids(self) -> frozenset[str]:
+        return self._ring_vendor_ids
+
+    def get_ring_itc_total(self) -> float:
+        """GST on every invoice from a vendor on any circular link."""
+        return self._ring_itc_total
+
+    def get_community_id(self, vendor_id: str) -> int:
+        """Louvain community (1-based) of a vendor in the transaction graph."""
+        return self._community_of[vendor_id]
+
+    def _compute_dashboard_summary(self) -> dict:
+        # One pass over the invoices: ITC per category id plus match/mismatch counts
+        itc_by_cat = [0] * len(RISK_CATEGORIES)
+        matched = mismatched = 0
+        for i in self.invoices:
+            itc_by_cat[i.risk_category_id] += i.total_gst
+            status = i.status
+            if status == "MATCHED":
+                matched += 1
+            elif status == "MISMATCHED":
+                mismatched += 1
+        clean_itc, medium_itc, high_itc, critical_itc = itc_by_cat
+        total_itc       = sum(itc_by_cat)
         critical_vendors= sum(1 for v in self.vendors if v["risk_category"] == "CRITICAL")
 
         return {
@@ -474,25 +702,31 @@ class MockDataStore:
         }
 
     def get_risk_distribution(self) -> list[dict]:
-        dist = {"LOW": 0, "MEDIUM": 0, "HIGH": 0, "CRITICAL": 0}
-        for inv in self.invoices:
-            dist[inv["risk_category"]] += 1
-        return [{"category": k, "count": v} for k, v in dist.items()]
+        return self._dist
 
     def get_period_trend(self) -> list[dict]:
-        trend = {}
+        return self._trend
+
+    def _compute_distribution_and_trend(self) -> tuple[list[dict], list[dict]]:
+        """Risk-category counts and per-period totals, grouped in a single pass over invoices."""
+        counts = [0] * len(RISK_CATEGORIES)
+        trend  = {}
         for inv in self.invoices:
-            p = inv["period"]
-            if p not in trend:
-                trend[p] = {"period": p, "total": 0, "mismatched": 0, "itc": 0}
-            trend[p]["total"] += 1
-            trend[p]["itc"]   += inv["total_gst"]
-            if inv["status"] == "MISMATCHED":
-                trend[p]["mismatched"] += 1
+            counts[inv.risk_category_id] += 1
+            p = inv.period
+            bucket = trend.get(p)
+            if bucket is None:
+                bucket = trend[p] = {"period": p, "total": 0, "mismatched": 0, "itc": 0}
+            bucket["total"] += 1
+            bucket["itc"]   += inv.total_gst
+            if inv.status == "MISMATCHED":
+                bucket["mismatched"] += 1
+
         result = sorted(trend.values(), key=lambda x: x["period"])
         for r in result:
             r["mismatch_pct"] = round(r["mismatched"] / r["total"] * 100, 1) if r["total"] else 0
-        return result
+        dist = [{"category": c, "count": n} for c, n in zip(RISK_CATEGORIES, counts)]
+        return dist, result
 
 
 # Singleton instance — imported by all services
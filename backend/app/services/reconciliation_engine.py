@@ -26,100 +26,181 @@ Why graph traversal is superior to SQL JOINs:
   - Pattern matching in Cypher is declarative and readable
 """
 
-from app.services.mock_data import store
-from app.services.audit_engine import generate_audit_report
+from itertools import islice
 
+from app.services.mock_data import Invoice, RiskLevel, store
+from app.services.audit_engine import RECOMMENDED_ACTIONS, generate_audit_report
 
-def reconcile_invoice(invoice_id: str) -> dict:
+
+def reconcile_invoice(invoice_id: str, verbose: bool = False) -> dict:
     """
     Run full multi-hop reconciliation for a single invoice.
-    Returns validation result with hop-by-hop breakdown.
+    Returns validation result with hop-by-hop breakdown; `verbose` adds each
+    hop's Cypher pattern and human-readable detail.
+
+    Mock data is immutable once loaded at startup, so every invoice's compact
+    result is built once and served from the store (shared — callers must not mutate).
     """
-    store.initialize()
-    invoice = store.get_invoice_by_id(invoice_id)
-    if not invoice:
+    result = store.get_reconciliations(_build_all_reconciliations).get(invoice_id)
+    if result is None:
         return {"error": f"Invoice {invoice_id} not found"}
+    if verbose:
+        details = _hop_details(store.get_invoice_by_id(invoice_id))
+        hops = [{**hop, **extra} for hop, extra in zip(result["traversal_hops"], details)]
+        result = {**result, "traversal_hops": hops}
+    return result
+
+
+def _build_all_reconciliations() -> dict[str, dict]:
+    return {inv.invoice_id: _build_reconciliation(inv) for inv in store.invoices}
+
+
+# (traversal label, invoice flag checked — None means the hop always passes)
+_HOPS = (
+    ("Taxpayer → Invoice",                    None),
+    ("Invoice → Vendor",                      None),
+    ("Invoice → IRN (E-Invoice Validation)",  "irn_valid"),
+    ("Invoice → GSTR-2B (Purchase Register)", "in_gstr2b"),
+    ("Vendor → GSTR-1 (Sales Return Filing)", "vendor_filed"),
+    ("GSTR-3B → Payment (Tax Deposit)",       "tax_paid"),
+)
+
+
+def _hop_statuses(invoice: Invoice) -> list[dict]:
+    """Compact hop results: number, traversal label and PASS/FAIL only."""
+    return [
+        {
+            "hop":       n,
+            "traversal": traversal,
+            "status":    "PASS" if flag is None or getattr(invoice, flag) else "FAIL",
+        }
+        for n, (traversal, flag) in enumerate(_HOPS, 1)
+    ]
 
-    vendor = store.get_vendor_by_id(invoice["vendor_id"])
 
-    # Simulate each traversal hop
-    hops = [
+def _hop_details(invoice: Invoice) -> list[dict]:
+    """Verbose per-hop Cypher pattern and explanation, in hop order."""
+    invoice_id = invoice.invoice_id
+    period     = invoice.period
+    return [
         {
-            "hop":         1,
-            "traversal":   "Taxpayer → Invoice",
-            "cypher":      f"MATCH (t:Taxpayer {{gstin: '{store.taxpayer['gstin']}'}})-[:PURCHASED]->(inv:Invoice {{invoice_id: '{invoice_id}'}})",
-            "status":      "PASS",
-            "detail":      f"Invoice {invoice_id} is a valid purchase record for {store.taxpayer['name']}",
+            "cypher": f"MATCH (t:Taxpayer {{gstin: '{store.taxpayer['gstin']}'}})-[:PURCHASED]->(inv:Invoice {{invoice_id: '{invoice_id}'}})",
+            "detail": f"Invoice {invoice_id} is a valid purchase record for {store.taxpayer['name']}",
         },
         {
-            "hop":         2,
-            "traversal":   "Invoice → Vendor",
-            "cypher":      "MATCH (inv)-[:ISSUED_BY]->(v:Vendor)",
-            "status":      "PASS",
-            "detail":      f"Vendor: {invoice['vendor_name']} | GSTIN: {invoice['vendor_gstin']} | Score: {invoice['vendor_score']}",
+            "cypher": "MATCH (inv)-[:ISSUED_BY]->(v:Vendor)",
+            "detail": f"Vendor: {invoice.vendor_name} | GSTIN: {invoice.vendor_gstin} | Score: {invoice.vendor_score}",
         },
         {
-            "hop":         3,
-            "traversal":   "Invoice → IRN (E-Invoice Validation)",
-            "cypher":      "OPTIONAL MATCH (inv)-[:HAS_IRN]->(irn:IRN)",
-            "status":      "PASS" if invoice["irn_valid"] else "FAIL",
-            "detail":      (
-                f"IRN: {invoice['irn_number'][:16]}... (valid)"
-                if invoice["irn_valid"]
+            "cypher": "OPTIONAL MATCH (inv)-[:HAS_IRN]->(irn:IRN)",
+            "detail": (
+                f"IRN: {invoice.irn_number[:16]}... (valid)"
+                if invoice.irn_valid
                 else "IRN not found or invalid — e-invoice mandate violated"
             ),
         },
         {
-            "hop":         4,
-            "traversal":   "Invoice → GSTR-2B (Purchase Register)",
-            "cypher":      "OPTIONAL MATCH (inv)-[:REFLECTED_IN]->(g2b:GSTR2B)",
-            "status":      "PASS" if invoice["in_gstr2b"] else "FAIL",
-            "detail":      (
-                f"Invoice reflected in GSTR-2B for period {invoice['period']}"
-                if invoice["in_gstr2b"]
-                else f"Invoice NOT in GSTR-2B for period {invoice['period']} — ITC at risk"
+            "cypher": "OPTIONAL MATCH (inv)-[:REFLECTED_IN]->(g2b:GSTR2B)",
+            "detail": (
+                f"Invoice reflected in GSTR-2B for period {period}"
+                if invoice.in_gstr2b
+                else f"Invoice NOT in GSTR-2B for period {period} — ITC at risk"
             ),
         },
         {
-            "hop":         5,
-            "traversal":   "Vendor → GSTR-1 (Sales Return Filing)",
-            "cypher":      f"OPTIONAL MATCH (v)-[:FILED]->(g1:GSTR1 {{period: '{invoice['period']}'}})",
-            "status":      "PASS" if invoice["vendor_filed"] else "FAIL",
-            "detail":      (
-                f"Vendor filed GSTR-1 for period {invoice['period']}"
-                if invoice["vendor_filed"]
-                else f"Vendor did NOT file GSTR-1 for period {invoice['period']} — NON-FILER"
+            "cypher": f"OPTIONAL MATCH (v)-[:FILED]->(g1:GSTR1 {{period: '{period}'}})",
+            "detail": (
+                f"Vendor filed GSTR-1 for period {period}"
+                if invoice.vendor_filed
+                else f"Vendor did NOT file GSTR-1 for period {period} — NON-FILER"
             ),
         },
         {
-            "hop":         6,
-            "traversal":   "GSTR-3B → Payment (Tax Deposit)",
-            "cypher":      "OPTIONAL MATCH (g3b:GSTR3B)-[:SETTLED_BY]->(pmt:Payment)",
-            "status":      "PASS" if invoice["tax_paid"] else "FAIL",
-            "detail":      (
+            "cypher": "OPTIONAL MATCH (g3b:GSTR3B)-[:SETTLED_BY]->(pmt:Payment)",
+            "detail": (
                 "Tax payment confirmed in challan register"
-                if invoice["tax_paid"]
+                if invoice.tax_paid
                 else "Tax payment NOT confirmed — ITC chain broken at payment"
             ),
         },
     ]
 
+
+def _build_reconciliation(invoice: Invoice) -> dict:
+    hops   = _hop_statuses(invoice)
     passed = sum(1 for h in hops if h["status"] == "PASS")
-    failed = sum(1 for h in hops if h["status"] == "FAIL")
 
     audit = generate_audit_report(invoice)
 
     return {
-        "invoice_id":     invoice_id,
-        "reconciliation_status": invoice["status"],
-        "risk_category":  invoice["risk_category"],
-        "risk_score":     invoice["risk_score"],
+        "invoice_id":     invoice.invoice_id,
+        "reconciliation_status": invoice.status,
+        "risk_category":  invoice.risk_category,
+        "risk_score":     invoice.risk_score,
         "hops_passed":    passed,
-        "hops_failed":    failed,
+        "hops_failed":    len(hops) - passed,
         "traversal_hops": hops,
         "audit_report":   audit,
-        "gst_amount":     invoice["total_gst"],
-        "itc_safe":       invoice["risk_category"] == "LOW",
+        "gst_amount":     invoice.total_gst,
+        "itc_safe":       invoice.risk_category_id == RiskLevel.LOW,
+    }
+
+
+def select_invoices(
+    limit: int = 100,
+    risk_filter: str | None = None,
+    vendor_filter: str | None = None,
+) -> list[Invoice]:
+    """Filtered invoices, most at-risk first, capped at `limit`."""
+    # Index buckets are pre-sorted by risk score, so filters stay lazy and
+    # iteration stops as soon as `limit` rows match
+    risk = risk_filter.upper() if risk_filter else None
+    if risk and vendor_filter:
+        by_risk   = store.get_invoices_by_risk(risk)
+        by_vendor = store.get_invoices_for_vendor(vendor_filter)
+        if not by_risk or not by_vendor:
+            return []
+        if len(by_risk) <= len(by_vendor):
+            invoices = filter(lambda i: i.vendor_id == vendor_filter, by_risk)
+        else:
+            invoices = filter(lambda i: i.risk_category == risk, by_vendor)
+    elif risk:
+        invoices = store.get_invoices_by_risk(risk)
+    elif vendor_filter:
+        invoices = store.get_invoices_for_vendor(vendor_filter)
+    else:
+        invoices = store.get_invoices_by_score()
+
+    return list(islice(invoices, limit))
+
+
+def invoice_row(inv: Invoice) -> dict:
+    """
+    One row of the invoice list. Only the (precomputed) finding count and
+    action are listed, so no full audit report is built.
+    """
+    return {
+        "invoice_id":       inv.invoice_id,
+        "invoice_number":   inv.invoice_number,
+        "invoice_date":     inv.invoice_date,
+        "period":           inv.period,
+        "vendor_id":        inv.vendor_id,
+        "vendor_name":      inv.vendor_name,
+        "vendor_score":     inv.vendor_score,
+        "gst_rate":         inv.gst_rate,
+        "total_gst":        inv.total_gst,
+        "total_amount":     inv.total_amount,
+        "irn_valid":        inv.irn_valid,
+        "in_gstr2b":        inv.in_gstr2b,
+        "vendor_filed":     inv.vendor_filed,
+        "tax_paid":         inv.tax_paid,
+        "status":           inv.status,
+        "risk_score":       inv.risk_score,
+        "risk_category":    inv.risk_category,
+        "risk_reasons":     inv.risk_reasons,
+        "finding_count":    store.get_finding_count(inv.invoice_id),
+        "recommended_action": RECOMMENDED_ACTIONS[inv.risk_category],
+        "is_circular_trade": inv.is_circular_trade,
     }
 
 
@@ -132,43 +213,7 @@ def reconcile_all_invoices(
     Run reconciliation across all invoices with optional filtering.
     Returns paginated results with summary statistics.
     """
-    store.initialize()
-
-    invoices = store.invoices
-    if risk_filter:
-        invoices = [i for i in invoices if i["risk_category"] == risk_filter.upper()]
-    if vendor_filter:
-        invoices = [i for i in invoices if i["vendor_id"] == vendor_filter]
-
-    # Sort by risk score descending (most at-risk first)
-    invoices = sorted(invoices, key=lambda x: x["risk_score"], reverse=True)[:limit]
-
-    results = []
-    for inv in invoices:
-        audit = generate_audit_report(inv)
-        results.append({
-            "invoice_id":       inv["invoice_id"],
-            "invoice_number":   inv["invoice_number"],
-            "invoice_date":     inv["invoice_date"],
-            "period":           inv["period"],
-            "vendor_id":        inv["vendor_id"],
-            "vendor_name":      inv["vendor_name"],
-            "vendor_score":     inv["vendor_score"],
-            "gst_rate":         inv["gst_rate"],
-            "total_gst":        inv["total_gst"],
-            "total_amount":     inv["total_amount"],
-            "irn_valid":        inv["irn_valid"],
-            "in_gstr2b":        inv["in_gstr2b"],
-            "vendor_filed":     inv["vendor_filed"],
-            "tax_paid":         inv["tax_paid"],
-            "status":           inv["status"],
-            "risk_score":       inv["risk_score"],
-            "risk_category":    inv["risk_category"],
-            "risk_reasons":     inv["risk_reasons"],
-            "finding_count":    audit["finding_count"],
-            "recommended_action": audit["recommended_action"],
-            "is_circular_trade": inv.get("is_circular_trade", False),
-        })
+    results = [invoice_row(inv) for inv in select_invoices(limit, risk_filter, vendor_filter)]
 
     return {
         "total":   len(store.invoices),
@@ -18,7 +18,9 @@ Scalability Notes:
   - GSTN API integration: real-time compliance checks via sandbox APIs
 """
 
-from app.services.mock_data import store
+from collections import Counter
+
+from app.services.mock_data import IN_GSTR2B, IRN_VALID, TAX_PAID, VENDOR_FILED, RiskLevel, store
 
 
 def compute_vendor_risk_profile(vendor_id: str) -> dict:
@@ -28,7 +30,6 @@ def compute_vendor_risk_profile(vendor_id: str) -> dict:
       2. GSTR-1 filing history
       3. Graph position (how connected this vendor is)
     """
-    store.initialize()
     vendor = store.get_vendor_by_id(vendor_id)
     if not vendor:
         return {}
@@ -37,12 +38,22 @@ def compute_vendor_risk_profile(vendor_id: str) -> dict:
     if not invoices:
         return {**vendor, "invoice_count": 0, "risk_profile": "INSUFFICIENT_DATA"}
 
+    # Single pass over the vendor's invoices: flag-mask histogram plus GST exposure.
+    # Each rate below is then a sum over ≤64 distinct masks, not over invoices.
+    flag_counts: Counter = Counter()
+    total_gst_value = at_risk_gst = risk_hi = 0
+    for i in invoices:
+        flag_counts[i.flags] += 1
+        total_gst_value += i.total_gst
+        if i.risk_category_id >= RiskLevel.HIGH:
+            risk_hi     += 1
+            at_risk_gst += i.total_gst
+
     total   = len(invoices)
-    irn_ok  = sum(1 for i in invoices if i["irn_valid"])
-    in_2b   = sum(1 for i in invoices if i["in_gstr2b"])
-    filed   = sum(1 for i in invoices if i["vendor_filed"])
-    paid    = sum(1 for i in invoices if i["tax_paid"])
-    risk_hi = sum(1 for i in invoices if i["risk_category"] in ["HIGH", "CRITICAL"])
+    irn_ok  = sum(n for f, n in flag_counts.items() if f & IRN_VALID)
+    in_2b   = sum(n for f, n in flag_counts.items() if f & IN_GSTR2B)
+    filed   = sum(n for f, n in flag_counts.items() if f & VENDOR_FILED)
+    paid    = sum(n for f, n in flag_counts.items() if f & TAX_PAID)
 
     filing_rate   = filed  / total
     irn_rate      = irn_ok / total
@@ -76,9 +87,6 @@ def compute_vendor_risk_profile(vendor_id: str) -> dict:
     if is_circular:
         risk_flags.append("CIRCULAR_TRADE_SUSPECTED")
 
-    total_gst_value  = sum(i["total_gst"] for i in invoices)
-    at_risk_gst      = sum(i["total_gst"] for i in invoices if i["risk_category"] in ["HIGH", "CRITICAL"])
-
     return {
         "vendor_id":           vendor_id,
         "gstin":               vendor["gstin"],
@@ -102,32 +110,44 @@ def compute_vendor_risk_profile(vendor_id: str) -> dict:
     }
 
 
+def _by_compliance(profile: dict) -> float:
+    return profile.get("compliance_score", 1.0)
+
+
 def get_all_vendor_risk_profiles() -> list[dict]:
-    store.initialize()
+    """
+    Every vendor's profile, least compliant first. The mock store is immutable
+    after startup, so this is built on first use and kept on the store for the
+    life of the process (shared — callers must not mutate).
+    """
+    return store.get_vendor_profiles(_build_vendor_profiles)
+
+
+def _build_vendor_profiles() -> list[dict]:
     profiles = [compute_vendor_risk_profile(v["vendor_id"]) for v in store.vendors]
-    return sorted(profiles, key=lambda x: x.get("compliance_score", 1.0))
+    return sorted(profiles, key=_by_compliance)
+
+
+_SUMMARY_ORDER = ("CRITICAL", "HIGH", "MEDIUM", "LOW")
 
 
 def get_risk_summary() -> dict:
-    """Aggregate risk statistics across all vendors and invoices."""
-    store.initialize()
+    """
+    Aggregate risk statistics across all vendors and invoices. Computed once
+    and kept on the store — the mock data never changes after startup.
+    """
+    return store.get_risk_summary(_compute_risk_summary)
+
 
+def _compute_risk_summary() -> dict:
     vendor_profiles = get_all_vendor_risk_profiles()
-    invoices = store.invoices
+    # One counting pass per list instead of one scan per category
+    vendor_counts  = Counter(v.get("risk_category") for v in vendor_profiles)
+    invoice_counts = Counter(i.risk_category for i in store.invoices)
 
     return {
-        "vendor_risk_distribution": {
-            "CRITICAL": sum(1 for v in vendor_profiles if v.get("risk_category") == "CRITICAL"),
-            "HIGH":     sum(1 for v in vendor_profiles if v.get("risk_category") == "HIGH"),
-            "MEDIUM":   sum(1 for v in vendor_profiles if v.get("risk_category") == "MEDIUM"),
-            "LOW":      sum(1 for v in vendor_profiles if v.get("risk_category") == "LOW"),
-        },
-        "invoice_risk_distribution": {
-            "CRITICAL": sum(1 for i in invoices if i["risk_category"] == "CRITICAL"),
-            "HIGH":     sum(1 for i in invoices if i["risk_category"] == "HIGH"),
-            "MEDIUM":   sum(1 for i in invoices if i["risk_category"] == "MEDIUM"),
-            "LOW":      sum(1 for i in invoices if i["risk_category"] == "LOW"),
-        },
+        "vendor_risk_distribution":  {c: vendor_counts[c] for c in _SUMMARY_ORDER},
+        "invoice_risk_distribution": {c: invoice_counts[c] for c in _SUMMARY_ORDER},
         "top_risk_vendors": [
             {"vendor_id": v["vendor_id"], "name": v["name"],
              "score": v["compliance_score"], "category": v["risk_category"]}
@@ -3,8 +3,12 @@ GraphLedger AI — FastAPI Application Entry Point
 """
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from app.api.routes import dashboard, invoices, vendors, fraud
 from app.services.mock_data import store
+from app.core.cache import clear_all as clear_response_cache
+from app.core.http_cache import etag_middleware
 
 app = FastAPI(
     title="GraphLedger AI — GST Reconciliation Engine",
@@ -16,6 +20,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,  # C-extension encoder for the dict-heavy payloads
 )
 
 app.add_middleware(
@@ -25,11 +30,15 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.middleware("http")(etag_middleware)
+# Outermost, so ETags are computed on the uncompressed body
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
 
 # Initialize mock data on startup
 @app.on_event("startup")
 async def startup_event():
     store.initialize()
+    clear_response_cache()  # cached payloads must never outlive the data they were built from
     print("✅ GraphLedger AI backend started. Mock data loaded.")
 
 # Register routers
@@ -39,7 +48,7 @@ app.include_router(vendors.router,   prefix="/vendors",   tags=["Vendors"])
 app.include_router(fraud.router,     prefix="/fraud",     tags=["Fraud Detection"])
 
 @app.get("/", tags=["Health"])
-def root():
+async def root():
     return {
         "product": "GraphLedger AI",
         "status":  "running",
@@ -49,5 +58,5 @@ def root():
     }
 
 @app.get("/health", tags=["Health"])
-def health():
+async def health():
     return {"status": "healthy", "data_loaded": store._initialized}
@@ -13,19 +13,29 @@ Architecture:
     { "status": "error", "detail": "..." }
 """
 
+import asyncio
+import os
 import sys
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
+try:
+    import fcntl
+except ImportError:  # Windows — single-worker dev server, no lock needed
+    fcntl = None
 sys.path.insert(0, str(Path(__file__).parent))
 
+import orjson
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import PlainTextResponse
-from typing import Optional
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, PlainTextResponse, Response, StreamingResponse
+from typing import Literal, Optional
 
 from schema import NODE_TYPES, EDGE_SCHEMA, MISMATCH_TAXONOMY
 from data_generator import generate_all, DATA_DIR
 from reconciliation_engine import GSTKnowledgeGraph
-from audit_trail import AuditTrailGenerator
+from audit_trail import AuditTrailGenerator, GENERATION_TS
 from risk_predictor import VendorRiskPredictor
 
 # ─── App Initialization ───────────────────────────────────────
@@ -38,6 +48,7 @@ app = FastAPI(
     version="2.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
 )
 
 app.add_middleware(
@@ -46,6 +57,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Mismatch / vendor / schema JSON is highly repetitive — compresses 5-10x
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
 
 # ─── Singletons ───────────────────────────────────────────────
 kg        = GSTKnowledgeGraph()
@@ -53,25 +66,50 @@ audit_gen = AuditTrailGenerator()
 predictor: Optional[VendorRiskPredictor] = None
 
 
+def _ensure_data():
+    """Generate mock data if not present — once, even when several workers start together."""
+    if (DATA_DIR / "invoices.json").exists():
+        return
+    with open(DATA_DIR / ".generate.lock", "w") as lock:
+        if fcntl:
+            fcntl.flock(lock, fcntl.LOCK_EX)  # released when the file is closed
+        # Re-check: another worker may have finished generating while we waited
+        if not (DATA_DIR / "invoices.json").exists():
+            print("Generating mock data...")
+            generate_all()
+
+
 @app.on_event("startup")
 async def startup():
     global predictor
-    # Generate data if not present
-    if not (DATA_DIR / "invoices.json").exists():
-        print("Generating mock data...")
-        generate_all()
+    _ensure_data()
     kg.load_data()
     predictor = VendorRiskPredictor(kg)
+    # Only pull in chat_engine (Groq SDK) when chat can actually run; keep the
+    # task referenced so the loop cannot collect it mid-flight.
+    if os.getenv("GROQ_API_KEY"):
+        app.state.chat_warmup = asyncio.create_task(_warm_chat())
     print(f"✅ API ready. Graph: {kg.G.number_of_nodes()} nodes, "
           f"{kg.G.number_of_edges()} edges")
 
 
-def _ok(data) -> dict:
-    return {"status": "ok", "data": data}
+def _ok(data) -> ORJSONResponse:
+    # Return the response directly so FastAPI skips its jsonable_encoder pass
+    return ORJSONResponse({"status": "ok", "data": data})
+
+
+def _columnar(records: list) -> dict:
+    """List-of-dicts → {"columns": [...], "rows": [[...], ...]} so keys are sent once, not per row."""
+    columns = list(dict.fromkeys(k for r in records for k in r))
+    return {"columns": columns, "rows": [[r.get(c) for c in columns] for r in records]}
+
+
+# `?format=columnar` on the large list endpoints swaps the record list for _columnar()
+_FORMAT_QUERY = Query("rows", description="'rows' (list of objects) or 'columnar' (columns + row arrays)")
 
 
 def _check_gstin(gstin: str):
-    if not kg.G.has_node(f"gstin_{gstin}"):
+    if gstin not in kg._gstin_set:
         raise HTTPException(status_code=404, detail=f"GSTIN {gstin} not found in graph")
 
 
@@ -95,10 +133,8 @@ def health():
 # DELIVERABLE 1 — Schema
 # ═══════════════════════════════════════════════════════════════
 
-@app.get("/api/schema")
-def get_schema():
-    """Returns full node/edge schema and mismatch taxonomy."""
-    return _ok({
+def _build_schema() -> dict:
+    return {
         "node_types": {
             name: list(cls.__annotations__.keys())
             for name, cls in NODE_TYPES.items()
@@ -122,7 +158,17 @@ def get_schema():
             }
             for mtype, info in MISMATCH_TAXONOMY.items()
         },
-    })
+    }
+
+
+# Schema definitions are module constants — encode the response once at import
+_SCHEMA_JSON = orjson.dumps({"status": "ok", "data": _build_schema()})
+
+
+@app.get("/api/schema")
+def get_schema():
+    """Returns full node/edge schema and mismatch taxonomy."""
+    return Response(content=_SCHEMA_JSON, media_type="application/json")
 
 
 # ═══════════════════════════════════════════════════════════════
@@ -153,20 +199,30 @@ def reconcile(
 def get_mismatches(
     risk: Optional[str]  = Query(None, description="Risk level filter"),
     type: Optional[str]  = Query(None, alias="type", description="Mismatch type filter"),
-    limit: int           = Query(50, le=200),
+    limit: int           = Query(50, ge=0, le=200),
+    format: Literal["rows", "columnar"] = _FORMAT_QUERY,
 ):
     """Returns filtered mismatch list with total ITC at risk."""
-    results = kg.mismatches
-    if risk:
-        results = [m for m in results if m["risk_level"] == risk.upper()]
-    if type:
-        results = [m for m in results if m["mismatch_type"] == type.upper()]
-    results = sorted(results, key=lambda x: x["amount_at_risk"], reverse=True)[:limit]
+    # Buckets are pre-sorted by amount_at_risk, so filtering stops at `limit`
+    risk, type = risk and risk.upper(), type and type.upper()
+    if risk and type:
+        by_risk, by_type = kg._mis_by_risk.get(risk, []), kg._mis_by_type.get(type, [])
+        if len(by_risk) <= len(by_type):
+            results = (m for m in by_risk if m["mismatch_type"] == type)
+        else:
+            results = (m for m in by_type if m["risk_level"] == risk)
+    elif risk:
+        results = kg._mis_by_risk.get(risk, [])
+    elif type:
+        results = kg._mis_by_type.get(type, [])
+    else:
+        results = kg._mis_by_risk_amt
+    results = list(islice(results, limit))
     total_at_risk = sum(m["amount_at_risk"] for m in results)
     return _ok({
         "total":          len(results),
         "total_itc_at_risk": total_at_risk,
-        "mismatches":     results,
+        "mismatches":     _columnar(results) if format == "columnar" else results,
     })
 
 
@@ -199,30 +255,18 @@ def graph_clusters():
 @app.get("/api/dashboard/summary")
 def dashboard_summary():
     """Returns all KPIs: match rate, ITC at risk, critical count, mismatch breakdown."""
-    mis = kg.mismatches
-    total_risk     = sum(m["amount_at_risk"] for m in mis)
-    critical_count = sum(1 for m in mis if m["risk_level"] == "CRITICAL")
-
-    type_breakdown = {}
-    for m in mis:
-        t = m["mismatch_type"]
-        if t not in type_breakdown:
-            type_breakdown[t] = {"count": 0, "total_itc_at_risk": 0.0}
-        type_breakdown[t]["count"]           += 1
-        type_breakdown[t]["total_itc_at_risk"] += m["amount_at_risk"]
-
-    resolved = sum(1 for m in mis if m["resolution_status"] == "RESOLVED")
+    mis = kg.mismatches  # aggregates below are precomputed once at load
 
     return _ok({
         "kpis": {
             "total_invoices":       len(kg.invoices),
             "total_mismatches":     len(mis),
-            "critical_findings":    critical_count,
-            "total_itc_at_risk":    round(total_risk, 2),
+            "critical_findings":    kg.mis_critical,
+            "total_itc_at_risk":    round(kg.mis_total_risk, 2),
             "match_rate":           round((1 - len(mis) / max(1, len(kg.invoices))) * 100, 1),
-            "resolution_rate":      round(resolved / max(1, len(mis)) * 100, 1),
+            "resolution_rate":      round(kg.mis_resolved / max(1, len(mis)) * 100, 1),
         },
-        "mismatch_by_type": type_breakdown,
+        "mismatch_by_type": kg.mis_by_type,
         "graph_stats": kg.get_graph_stats(),
     })
 
@@ -231,40 +275,62 @@ def dashboard_summary():
 def vendors_risk(
     category: Optional[str] = Query(None, description="Risk category filter"),
     sector:   Optional[str] = Query(None, description="Sector filter"),
+    format:   Literal["rows", "columnar"] = _FORMAT_QUERY,
 ):
     """Returns vendor risk profiles with optional filtering."""
     results = kg.vendors
     if category:
-        results = [v for v in results if v["risk_category"] == category.upper()]
+        results = kg._vendors_by_cat.get(category.upper(), [])
     if sector:
-        results = [v for v in results if v.get("sector", "").lower() == sector.lower()]
-    return _ok({"total": len(results), "vendors": results})
+        if category:
+            results = [v for v in results if v.get("sector", "").lower() == sector.lower()]
+        else:
+            results = kg._vendors_by_sector.get(sector.lower(), [])
+    return _ok({"total": len(results),
+                "vendors": _columnar(results) if format == "columnar" else results})
 
 
 # ═══════════════════════════════════════════════════════════════
 # DELIVERABLE 4 — Audit Trail
 # ═══════════════════════════════════════════════════════════════
 
+_TS_SLOT = "\x00generated-at\x00"
+
+
+@lru_cache(maxsize=4096)
+def _audit_bytes(mismatch_id: str, graph_version: int) -> tuple[bytes, bytes]:
+    """
+    UTF-8 audit trail for one mismatch, split around its "Generated" timestamp.
+    Everything but the timestamp is fixed per mismatch, so it is rendered and
+    encoded once per graph version.
+    """
+    text = audit_gen.generate_audit_trail(kg._mis_index[mismatch_id], generated_at=_TS_SLOT)
+    head, tail = text.split(_TS_SLOT)
+    return head.encode("utf-8"), tail.encode("utf-8")
+
+
 @app.get("/api/audit/{mismatch_id}", response_class=PlainTextResponse)
 def audit_single(mismatch_id: str):
     """Generates and returns natural language audit trail for one mismatch."""
-    m = kg._mis_index.get(mismatch_id)
-    if not m:
+    if mismatch_id not in kg._mis_index:
         raise HTTPException(status_code=404, detail=f"Mismatch {mismatch_id} not found")
-    return audit_gen.generate_audit_trail(m)
+    head, tail = _audit_bytes(mismatch_id, kg._graph_version)
+    return PlainTextResponse(head + GENERATION_TS().encode("utf-8") + tail)
 
 
 @app.post("/api/audit/batch")
-def audit_batch(gstin: str = Query(..., description="GSTIN to generate batch audit for")):
+def audit_batch(
+    gstin: str = Query(..., description="GSTIN to generate batch audit for"),
+    detail: Literal["summary", "full"] = Query("full", description="'summary' omits per-mismatch findings"),
+):
     """Generates full audit report for all mismatches of a GSTIN."""
     _check_gstin(gstin)
     tp_data = kg._gstin_to_tp.get(gstin, {})
     company = tp_data.get("name", gstin)
-    gstin_mis = [m for m in kg.mismatches if m["supplier_gstin"] == gstin or
-                 m.get("buyer_gstin") == gstin]
+    gstin_mis = kg._mis_by_gstin.get(gstin, [])
     if not gstin_mis:
         raise HTTPException(status_code=404, detail=f"No mismatches found for {gstin}")
-    report = audit_gen.batch_audit_report(gstin_mis, company_name=company)
+    report = audit_gen.batch_audit_report(gstin_mis, company_name=company, detail_level=detail)
     return {"status": "ok", "data": {"report": report, "finding_count": len(gstin_mis)}}
 
 
@@ -272,6 +338,18 @@ def audit_batch(gstin: str = Query(..., description="GSTIN to generate batch aud
 # DELIVERABLE 5 — Predictions
 # ═══════════════════════════════════════════════════════════════
 
+@app.get("/api/predict/all")
+def predict_all(
+    top_n: int = Query(10, ge=1, le=50),
+    format: Literal["rows", "columnar"] = _FORMAT_QUERY,
+):
+    """Returns predictions for all vendors, top N by predicted risk score."""
+    result = predictor.predict_all_vendors(top_n=top_n)
+    if format == "columnar":
+        result["predictions"] = _columnar(result["predictions"])
+    return _ok(result)
+
+
 @app.get("/api/predict/{gstin}")
 def predict_vendor(gstin: str):
     """Returns next-period risk prediction with graph features and key factors."""
@@ -281,14 +359,6 @@ def predict_vendor(gstin: str):
     return _ok(result)
 
 
-@app.get("/api/predict/all")
-def predict_all(top_n: int = Query(10, ge=1, le=50)):
-    """Returns predictions for all vendors, top N by predicted risk score."""
-    result = predictor.predict_all_vendors()
-    result["predictions"] = result["predictions"][:top_n]
-    return _ok(result)
-
-
 # ═══════════════════════════════════════════════════════════════
 # DELIVERABLE — Section 16(2)(b) Payment Compliance
 # ═══════════════════════════════════════════════════════════════
@@ -354,34 +424,46 @@ def payment_compliance_summary():
 
 # ── OCR Upload Router ─────────────────────────────────────────────
 from fastapi import UploadFile, File
-from ocr_engine import InvoiceOCREngine
 
-ocr_engine_instance = InvoiceOCREngine()
+
+@lru_cache(maxsize=None)
+def _ocr():
+    """OCR engine singleton, built on first use — pdfplumber / tesseract stay out of cold start."""
+    from ocr_engine import InvoiceOCREngine
+    return InvoiceOCREngine()
+
+
+OCR_MAX_UPLOAD_BYTES = 20 * 1024 * 1024
+
 
 @app.post("/api/ocr/upload")
 async def ocr_upload(file: UploadFile = File(...)):
     """Upload a PDF or image invoice for OCR extraction and GSTR-2B validation."""
-    content = await file.read()
     filename = file.filename or "upload"
     ext = filename.lower().rsplit(".", 1)[-1]
 
     if ext == "pdf":
-        result = ocr_engine_instance.extract_from_pdf(content, filename)
+        extract = _ocr().extract_from_pdf
     elif ext in ("png", "jpg", "jpeg", "tiff", "bmp"):
-        result = ocr_engine_instance.extract_from_image(content, filename)
+        extract = _ocr().extract_from_image
     else:
         raise HTTPException(status_code=422, detail=f"Unsupported file type: .{ext}. Use PDF or image.")
+    if file.size is not None and file.size > OCR_MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail="File too large (max 20 MB)")
 
-    return result
+    # Starlette has already spooled the upload to a temp file (disk past 1 MB);
+    # hand that file object to the engine instead of reading it all into memory
+    return await asyncio.to_thread(extract, file.file, filename)
 
 @app.get("/api/ocr/history")
 def ocr_history():
     """Return all previously uploaded invoice OCR results."""
-    return {"uploads": ocr_engine_instance.get_history(), "stats": ocr_engine_instance.get_summary_stats()}
+    ocr = _ocr()
+    return {"uploads": ocr.get_history(), "stats": ocr.get_summary_stats()}
 
 @app.get("/api/ocr/stats")
 def ocr_stats():
-    return ocr_engine_instance.get_summary_stats()
+    return _ocr().get_summary_stats()
 
 @app.post("/api/ocr/text")
 async def ocr_from_text(payload: dict):
@@ -390,7 +472,7 @@ async def ocr_from_text(payload: dict):
     filename = payload.get("filename", "pasted_text")
     if not text:
         raise HTTPException(status_code=422, detail="text field required")
-    return ocr_engine_instance.extract_from_text(text, filename)
+    return _ocr().extract_from_text(text, filename)
 
 @app.get("/api/ocr/sample-invoices")
 def list_sample_invoices():
@@ -406,11 +488,61 @@ def list_sample_invoices():
 # ═══════════════════════════════════════════════════════════════
 # CHATBOT — Groq AI Assistant
 # ═══════════════════════════════════════════════════════════════
+import threading
+import time
+from collections import OrderedDict
+
 from pydantic import BaseModel
-from chat_engine import chat as groq_chat
 
-# In-memory session store: session_id → history list
-_chat_sessions: dict = {}
+
+@lru_cache(maxsize=None)
+def _groq_chat():
+    """chat_engine pulls in the Groq SDK — import it on the first chat request."""
+    from chat_engine import chat
+    return chat
+
+
+@lru_cache(maxsize=None)
+def _groq_chat_stream():
+    from chat_engine import chat_stream
+    return chat_stream
+
+async def _warm_chat():
+    """Seed Groq's prefix cache with the system prompt + tools so the first chat is not cold."""
+    from chat_engine import warm_prefix_cache
+    await warm_prefix_cache()
+
+# In-memory session store: session_id → (expires_at, history), least recently used first.
+# Bounded and TTL-evicted so abandoned sessions cannot grow the worker without limit.
+CHAT_SESSION_TTL = 3600
+CHAT_SESSION_MAX = 10_000
+_chat_sessions: "OrderedDict[str, tuple[float, list]]" = OrderedDict()
+_chat_lock = threading.Lock()  # sync handlers run in the threadpool
+
+
+def _session_get(session_id: str) -> list:
+    with _chat_lock:
+        entry = _chat_sessions.get(session_id)
+        if entry is None:
+            return []
+        if entry[0] <= time.monotonic():
+            del _chat_sessions[session_id]
+            return []
+        _chat_sessions.move_to_end(session_id)
+        return entry[1]
+
+
+def _session_put(session_id: str, history: list) -> None:
+    with _chat_lock:
+        _chat_sessions[session_id] = (time.monotonic() + CHAT_SESSION_TTL, history)
+        _chat_sessions.move_to_end(session_id)
+        while len(_chat_sessions) > CHAT_SESSION_MAX:
+            _chat_sessions.popitem(last=False)
+
+
+def _session_drop(session_id: str) -> None:
+    with _chat_lock:
+        _chat_sessions.pop(session_id, None)
 
 class ChatRequest(BaseModel):
     message: str
@@ -425,16 +557,16 @@ async def chat_endpoint(req: ChatRequest):
     Request:  { "message": "...", "session_id": "user123" }
     Response: { "reply": "...", "session_id": "...", "turn": N }
     """
-    history = _chat_sessions.get(req.session_id, [])
+    history = _session_get(req.session_id)
 
     try:
-        reply, new_history = groq_chat(
+        reply, new_history = await _groq_chat()(
             user_message=req.message,
             history=history,
             kg=kg,
             predictor=predictor,
         )
-        _chat_sessions[req.session_id] = new_history[-20:]  # Keep last 20 turns
+        _session_put(req.session_id, new_history[-20:])  # Keep last 20 turns
         return {
             "status": "ok",
             "reply": reply,
@@ -443,20 +575,64 @@ async def chat_endpoint(req: ChatRequest):
         }
     except Exception as e:
         # Auto-clear corrupted session so the next message starts fresh
-        _chat_sessions.pop(req.session_id, None)
+        _session_drop(req.session_id)
         return {"status": "error", "reply": f"⚠️ AI service error: {str(e)}", "session_id": req.session_id}
 
 
+def _sse(data: dict, event: Optional[str] = None) -> bytes:
+    head = f"event: {event}\n".encode() if event else b""
+    return head + b"data: " + orjson.dumps(data) + b"\n\n"
+
+
+@app.post("/api/chat/stream")
+async def chat_stream_endpoint(req: ChatRequest):
+    """
+    Streaming variant of /api/chat as Server-Sent Events, so the UI can
+    render the reply as Groq generates it.
+
+    Events:  data: {"delta": "..."}                          (repeated)
+             event: done   data: {"session_id": "...", "turn": N}
+             event: error  data: {"reply": "..."}
+    """
+    history = _session_get(req.session_id)
+    chat_stream = _groq_chat_stream()
+
+    async def events():
+        done: list = []
+        try:
+            async for delta in chat_stream(
+                user_message=req.message,
+                history=history,
+                kg=kg,
+                predictor=predictor,
+                on_complete=lambda reply, new_history: done.append(new_history),
+            ):
+                yield _sse({"delta": delta})
+        except Exception as e:
+            _session_drop(req.session_id)
+            yield _sse({"reply": f"⚠️ AI service error: {str(e)}"}, event="error")
+            return
+        new_history = done[0]
+        _session_put(req.session_id, new_history[-20:])
+        yield _sse({
+            "session_id": req.session_id,
+            "turn": len([m for m in new_history if m.get("role") == "assistant"]),
+        }, event="done")
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
 @app.delete("/api/chat/{session_id}")
 def clear_chat_session(session_id: str):
     """Clear conversation history for a session."""
-    _chat_sessions.pop(session_id, None)
+    _session_drop(session_id)
     return {"status": "ok", "message": f"Session '{session_id}' cleared"}
 
 
 # ─── Main ─────────────────────────────────────────────────────
 if __name__ == "__main__":
     import uvicorn
-    import os
+    from dotenv import load_dotenv
+    load_dotenv()  # chat_engine is imported lazily now, so .env (PORT, GROQ_API_KEY) is loaded here
     port = int(os.getenv("PORT", 8001))
     uvicorn.run("api:app", host="0.0.0.0", port=port, reload=False)
@@ -16,23 +16,39 @@ Output is suitable for:
   - Evidence preservation in DGGI investigations
 """
 
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, fields
 from datetime import datetime
-from typing import Optional
-import re
-import sys
+from functools import lru_cache, partial
+from typing import Iterator, Literal, Optional, TextIO, Union
 import os
-sys.path.insert(0, os.path.dirname(__file__))
+import re
+import textwrap
+
+# gst_engine/ is already on sys.path when run as a script or via api.py;
+# the relative form covers `import gst_engine.audit_trail` from the repo root
 try:
     from schema import MISMATCH_TAXONOMY
 except ImportError:
-    MISMATCH_TAXONOMY = {}
+    try:
+        from .schema import MISMATCH_TAXONOMY
+    except ImportError:
+        MISMATCH_TAXONOMY = {}
 
 
 # ─── Indian Number Formatting ────────────────────────────────
+# A comma after every digit followed by the last three digits plus whole
+# pairs: 12345678 → 1,23,45,678
+_INDIAN_COMMA_RE = re.compile(r"(\d)(?=(?:\d\d)*\d{3}$)")
+
+
+@lru_cache(maxsize=4096)
 def _inr(amount: float) -> str:
     """
     Format amount in Indian number system (lakhs/crores).
     INR 1,23,45,678 style formatting.
+    Memoized — batch reports repeat the same totals and per-finding amounts.
     """
     if amount >= 1_00_00_000:
         return f"INR {amount / 1_00_00_000:.2f} Crore"
@@ -42,38 +58,43 @@ def _inr(amount: float) -> str:
     s = str(int(amount))
     if len(s) <= 3:
         return f"INR {s}"
-    last3 = s[-3:]
-    rest = s[:-3]
-    parts = []
-    while len(rest) > 2:
-        parts.append(rest[-2:])
-        rest = rest[:-2]
-    if rest:
-        parts.append(rest)
-    formatted = ",".join(reversed(parts)) + "," + last3
+    formatted = _INDIAN_COMMA_RE.sub(r"\1,", s)
     paise = f".{int((amount % 1) * 100):02d}"
     return f"INR {formatted}{paise}"
 
 
+# Horizontal rules for finding (72) and batch report (76) trailers
+_RULE_72 = "─" * 72
+_RULE_76 = "─" * 76
+
+# Batch report section headers and table underlines
+_HDR_SUMMARY     = "┌─ EXECUTIVE SUMMARY " + "─" * 52
+_HDR_BREAKDOWN   = "┌─ MISMATCH BREAKDOWN " + "─" * 51
+_HDR_FINDINGS    = "┌─ DETAILED FINDINGS " + "─" * 52
+_BREAKDOWN_RULE  = f"  {'─'*24} {'─'*6}  {'─'*18}  {'─'*8}"
+_MATRIX_RULE     = f"  {'─'*11} {'─'*44} {'─'*5}"
+
+
+@lru_cache(maxsize=256)
 def _box(title: str, width: int = 72) -> str:
-    """Draw ASCII box header."""
-    inner = width - 2
-    line  = "=" * inner
-    pad   = max(0, (inner - len(title) - 2) // 2)
-    return (
-        f"+{line}+\n"
-        f"| {' ' * pad}{title}{' ' * pad} {'|' if (inner - len(title) - 2) % 2 == 0 else ' |'}\n"
-        f"+{line}+"
-    )
+    """Draw ASCII box header, title centred (odd slack goes to the right)."""
+    line = "=" * (width - 2)
+    return f"+{line}+\n| {title:^{width - 4}} |\n+{line}+"
 
 
+@lru_cache(maxsize=256)
 def _section(title: str, width: int = 72) -> str:
     """Section divider."""
     dashes = "-" * (width - len(title) - 3)
     return f"+- {title} {dashes}"
 
 
-GENERATION_TS = lambda: datetime.now().strftime("%d-%b-%Y %H:%M:%S IST")
+_TS_FORMAT = "%d-%b-%Y %H:%M:%S IST"
+
+
+def GENERATION_TS() -> str:
+    """Report "Generated" timestamp. Batch reports take it once and pass it to every finding."""
+    return datetime.now().strftime(_TS_FORMAT)
 
 
 # ─── Root Cause Library ──────────────────────────────────────
@@ -255,177 +276,296 @@ ADMISSIBILITY = {
     "PAYMENT_OVERDUE_180_DAYS": "INADMISSIBLE — REVERSE + PAY INTEREST (RE-CLAIMABLE ON PAYMENT)",
 }
 
+ESCALATION = {
+    "CRITICAL": "ESCALATE IMMEDIATELY to CFO and Tax Compliance Head. "
+                "Initiate vendor audit under Section 65 CGST Act. "
+                "Preserve all invoice evidence for potential DGGI inquiry.",
+    "HIGH":     "Escalate to Senior Tax Manager within 48 hours. "
+                "Initiate supplier communication and set 7-day resolution deadline.",
+    "MEDIUM":   "Flag for next monthly compliance review. "
+                "Add to vendor watch list for enhanced monitoring.",
+    "LOW":      "Record in compliance tracker. "
+                "Review at quarterly audit cycle.",
+}
+
+
+# Word-wrap settings for section bodies: 68 chars of text after a 2-space indent.
+# Never split hyphenated terms like "GSTR-2B" or long legal references.
+_ROOT_WRAPPER = textwrap.TextWrapper(
+    width=70, initial_indent="  ", subsequent_indent="  ",
+    break_long_words=False, break_on_hyphens=False,
+)
+
+
+def _wrap_root_cause(root: str) -> list:
+    """Split a root-cause paragraph on sentences and word-wrap each at 68 chars."""
+    lines = []
+    for para in root.split(". "):
+        lines.extend(_ROOT_WRAPPER.wrap(para))
+    return lines
+
+
+def _wrap_actions(actions: list) -> list:
+    """Number each action and word-wrap it at 65 chars with a hanging indent."""
+    lines = []
+    for i, action in enumerate(actions, 1):
+        lines.extend(textwrap.wrap(
+            action, width=70, initial_indent=f"  {i}. ", subsequent_indent="     ",
+            break_long_words=False, break_on_hyphens=False,
+        ))
+    return lines
+
+
+# Root-cause / action / legal-reference text is fixed per mismatch type, so
+# each section body is wrapped and formatted once here instead of per finding
+_ROOT_CAUSES_WRAPPED = {t: "\n".join(_wrap_root_cause(text)) for t, text in ROOT_CAUSES.items()}
+_ACTIONS_WRAPPED     = {t: "\n".join(_wrap_actions(acts)) for t, acts in ACTIONS.items()}
+_LEGAL_REFS_BLOCK    = {
+    t: "\n".join(f"  • {ref}" for ref in refs) for t, refs in LEGAL_REFS.items()
+}
+_DEFAULT_ROOT_CAUSE  = "\n".join(_wrap_root_cause("Root cause under investigation."))
+_DEFAULT_ACTIONS     = "\n".join(_wrap_actions(["Investigate and resolve with supplier."]))
+_DEFAULT_LEGAL_REFS  = "  • Section 16 CGST Act 2017"
+
+
+# Fixed ITC-impact caveats appended under section 3 for these mismatch types
+IMPACT_NOTES = {
+    "IRN_MISMATCH": (
+        "  [WARN]  CRITICAL: Full ITC reversal required with 18% interest\n"
+        "      per day from date of claim. Penalty may apply."
+    ),
+    "INVOICE_MISSING_2B": (
+        "  NOTE: ITC may be claimed in future period once invoice\n"
+        "        appears in GSTR-2B (Section 16(2)(aa) compliance)."
+    ),
+}
+
+
+@dataclass(slots=True)
+class Mismatch:
+    """
+    One mismatch record as read by the audit trail, with the generator's defaults.
+    Callers rendering many findings can build these once; plain dicts are
+    converted on entry.
+    """
+    mismatch_id:        str   = "MIS-001"
+    mismatch_type:      str   = "AMOUNT_MISMATCH"
+    invoice_no:         str   = "N/A"
+    supplier_gstin:     str   = "N/A"
+    buyer_gstin:        str   = "N/A"
+    return_period:      str   = "N/A"
+    detected_date:      Optional[str]   = None   # default: today
+    gstr1_value:        float = 0.0
+    gstr2b_value:       float = 0.0
+    amount_at_risk:     float = 0.0
+    risk_level:         str   = "HIGH"
+    resolution_status:  str   = "PENDING"
+    days_overdue:       int   = 0
+    interest_liability: Optional[float] = None   # default: 18% p.a. on amount_at_risk
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "Mismatch":
+        return cls(**{k: d[k] for k in _MISMATCH_FIELDS if k in d})
+
+
+_MISMATCH_FIELDS = tuple(f.name for f in fields(Mismatch))
+
+
+# Below this many findings, batch_audit_report(parallel=True) renders in-process
+PARALLEL_MIN_FINDINGS = 5000
+
 
 class AuditTrailGenerator:
     """Generates formal GST audit trail documents."""
 
-    def generate_audit_trail(self, mismatch: dict) -> str:
+    def generate_audit_trail(self, mismatch: Union[dict, Mismatch], generated_at: Optional[str] = None) -> str:
         """
         Generate a formal audit finding document for a single mismatch.
 
         Args:
-            mismatch: dict with keys:
+            mismatch: Mismatch, or dict with keys:
                 mismatch_id, mismatch_type, invoice_no, supplier_gstin,
                 buyer_gstin, return_period, detected_date,
                 gstr1_value (optional), gstr2b_value (optional),
                 amount_at_risk, risk_level, resolution_status
+            generated_at: "Generated" timestamp text (default: now)
 
         Returns:
             Formatted plain-text audit finding document
         """
-        mtype   = mismatch.get("mismatch_type", "AMOUNT_MISMATCH")
-        inv_no  = mismatch.get("invoice_no", "N/A")
-        sup_gstin = mismatch.get("supplier_gstin", "N/A")
-        buy_gstin = mismatch.get("buyer_gstin", "N/A")
-        period  = mismatch.get("return_period", "N/A")
-        det_date= mismatch.get("detected_date", datetime.now().strftime("%d-%b-%Y"))
-        g1_val  = mismatch.get("gstr1_value", 0.0)
-        g2b_val = mismatch.get("gstr2b_value", 0.0)
-        at_risk = mismatch.get("amount_at_risk", 0.0)
-        rlevel  = mismatch.get("risk_level", "HIGH")
-        status  = mismatch.get("resolution_status", "PENDING")
-        mid     = mismatch.get("mismatch_id", "MIS-001")
-
-        variance     = abs(g1_val - g2b_val) if g1_val and g2b_val else at_risk
-        variance_pct = (variance / g1_val * 100) if g1_val else 0.0
+        lines: list = []
+        self._emit_audit_trail(mismatch, lines, generated_at)
+        return "\n".join(lines)
+
+    def _emit_audit_trail(
+        self, mismatch: Union[dict, Mismatch], lines: list, generated_at: Optional[str] = None,
+    ) -> None:
+        """Append the finding's text blocks to `lines` (joined with "\\n" by the caller)."""
+        m = Mismatch.from_dict(mismatch) if isinstance(mismatch, dict) else mismatch
+        mtype   = m.mismatch_type
+        inv_no  = m.invoice_no
+        sup_gstin = m.supplier_gstin
+        buy_gstin = m.buyer_gstin
+        period  = m.return_period
+        det_date= m.detected_date if m.detected_date is not None else datetime.now().strftime("%d-%b-%Y")
+        g1_val  = m.gstr1_value
+        g2b_val = m.gstr2b_value
+        at_risk = m.amount_at_risk
+        rlevel  = m.risk_level
+        status  = m.resolution_status
+        mid     = m.mismatch_id
+
         prefix       = "[WARN]  CRITICAL FRAUD INDICATOR — " if mtype == "IRN_MISMATCH" else ""
+        title        = f"{prefix}AUDIT FINDING — {mtype.replace('_', ' ')}"
         admissibility= ADMISSIBILITY.get(mtype, "AT RISK")
 
-        lines = []
-
         # ── HEADER ──────────────────────────────────────────
-        lines.append(_box(f"{prefix}AUDIT FINDING — {mtype.replace('_', ' ')}"))
-        lines.append(f"  Reference No  : {mid}")
-        lines.append(f"  Finding Type  : {mtype}")
-        lines.append(f"  Invoice No    : {inv_no}")
-        lines.append(f"  Supplier GSTIN: {sup_gstin}")
-        lines.append(f"  Buyer GSTIN   : {buy_gstin}")
-        lines.append(f"  Return Period : {period}")
-        lines.append(f"  Detected Date : {det_date}")
-        lines.append(f"  Risk Level    : {rlevel}")
-        lines.append(f"  Status        : {status}")
-        lines.append(f"  Generated     : {GENERATION_TS()}")
-        lines.append("")
+        lines.append(
+            f"{_box(title)}\n"
+            f"  Reference No  : {mid}\n"
+            f"  Finding Type  : {mtype}\n"
+            f"  Invoice No    : {inv_no}\n"
+            f"  Supplier GSTIN: {sup_gstin}\n"
+            f"  Buyer GSTIN   : {buy_gstin}\n"
+            f"  Return Period : {period}\n"
+            f"  Detected Date : {det_date}\n"
+            f"  Risk Level    : {rlevel}\n"
+            f"  Status        : {status}\n"
+            f"  Generated     : {generated_at or GENERATION_TS()}\n"
+        )
 
         # ── OBSERVATION ─────────────────────────────────────
-        lines.append(_section("1. OBSERVATION"))
         if g1_val and g2b_val:
-            lines.append(f"  GSTR-1 Value (as filed by supplier) : {_inr(g1_val)}")
-            lines.append(f"  GSTR-2B Value (auto-populated)      : {_inr(g2b_val)}")
-            lines.append(f"  Variance                            : {_inr(variance)} ({variance_pct:.1f}%)")
+            variance     = abs(g1_val - g2b_val)
+            variance_pct = variance / g1_val * 100
+            observed = (
+                f"  GSTR-1 Value (as filed by supplier) : {_inr(g1_val)}\n"
+                f"  GSTR-2B Value (auto-populated)      : {_inr(g2b_val)}\n"
+                f"  Variance                            : {_inr(variance)} ({variance_pct:.1f}%)"
+            )
         else:
-            lines.append(f"  ITC Amount at Risk                  : {_inr(at_risk)}")
-        lines.append(f"  ITC Admissibility                   : {admissibility}")
-        lines.append("")
+            observed = f"  ITC Amount at Risk                  : {_inr(at_risk)}"
+        lines.append(
+            f"{_section('1. OBSERVATION')}\n"
+            f"{observed}\n"
+            f"  ITC Admissibility                   : {admissibility}\n"
+        )
 
         # ── ROOT CAUSE ──────────────────────────────────────
         lines.append(_section("2. ROOT CAUSE ANALYSIS"))
-        root = ROOT_CAUSES.get(mtype, "Root cause under investigation.")
-        for para in root.split(". "):
-            if para.strip():
-                # Word-wrap at 68 chars
-                words = para.strip().split()
-                line_buf, out = [], []
-                for w in words:
-                    if sum(len(x) + 1 for x in line_buf) + len(w) > 68:
-                        out.append("  " + " ".join(line_buf))
-                        line_buf = [w]
-                    else:
-                        line_buf.append(w)
-                if line_buf:
-                    out.append("  " + " ".join(line_buf))
-                lines.extend(out)
+        lines.append(_ROOT_CAUSES_WRAPPED.get(mtype, _DEFAULT_ROOT_CAUSE))
         lines.append("")
 
         # ── ITC IMPACT ──────────────────────────────────────
-        lines.append(_section("3. ITC IMPACT ASSESSMENT"))
-        lines.append(f"  Total ITC at Risk    : {_inr(at_risk)}")
-        lines.append(f"  ITC Admissibility    : {admissibility}")
         disallow_section = LEGAL_REFS.get(mtype, ["Section 16 CGST Act"])[0]
-        lines.append(f"  Disallowance Basis   : {disallow_section}")
-        if mtype == "IRN_MISMATCH":
-            lines.append(f"  [WARN]  CRITICAL: Full ITC reversal required with 18% interest")
-            lines.append(f"      per day from date of claim. Penalty may apply.")
-        elif mtype == "INVOICE_MISSING_2B":
-            lines.append(f"  NOTE: ITC may be claimed in future period once invoice")
-            lines.append(f"        appears in GSTR-2B (Section 16(2)(aa) compliance).")
-        elif mtype == "PAYMENT_OVERDUE_180_DAYS":
-            days_overdue = mismatch.get("days_overdue", 0)
-            interest     = mismatch.get("interest_liability", round(at_risk * 0.18 * (days_overdue / 365), 2))
-            lines.append(f"  Days Since Invoice   : {days_overdue} days (threshold: 180 days)")
-            lines.append(f"  Interest Liability   : {_inr(interest)} @ 18% p.a. (Section 50(3))")
-            lines.append(f"  Total Liability      : {_inr(at_risk + interest)}")
-            lines.append(f"  [WARN]  ITC is RE-CLAIMABLE once supplier payment is made.")
-            lines.append(f"      Re-claim in GSTR-3B Table 4(A)(5) of payment month.")
+        lines.append(
+            f"{_section('3. ITC IMPACT ASSESSMENT')}\n"
+            f"  Total ITC at Risk    : {_inr(at_risk)}\n"
+            f"  ITC Admissibility    : {admissibility}\n"
+            f"  Disallowance Basis   : {disallow_section}"
+        )
+        if mtype == "PAYMENT_OVERDUE_180_DAYS":
+            days_overdue = m.days_overdue
+            interest     = m.interest_liability
+            if interest is None:
+                interest = round(at_risk * 0.18 * (days_overdue / 365), 2)
+            total_liability = at_risk + interest
+            lines.append(
+                f"  Days Since Invoice   : {days_overdue} days (threshold: 180 days)\n"
+                f"  Interest Liability   : {_inr(interest)} @ 18% p.a. (Section 50(3))\n"
+                f"  Total Liability      : {_inr(total_liability)}\n"
+                f"  [WARN]  ITC is RE-CLAIMABLE once supplier payment is made.\n"
+                f"      Re-claim in GSTR-3B Table 4(A)(5) of payment month."
+            )
+        elif mtype in IMPACT_NOTES:
+            lines.append(IMPACT_NOTES[mtype])
         lines.append("")
 
         # ── RECOMMENDED ACTIONS ─────────────────────────────
         lines.append(_section("4. RECOMMENDED ACTIONS"))
-        actions = ACTIONS.get(mtype, ["Investigate and resolve with supplier."])
-        for i, action in enumerate(actions, 1):
-            words = action.split()
-            line_buf, out = [], []
-            prefix_str = f"  {i}. "
-            cont_prefix = "     "
-            for w in words:
-                if sum(len(x) + 1 for x in line_buf) + len(w) > 65:
-                    pfx = prefix_str if not out else cont_prefix
-                    out.append(pfx + " ".join(line_buf))
-                    line_buf = [w]
-                else:
-                    line_buf.append(w)
-            if line_buf:
-                pfx = prefix_str if not out else cont_prefix
-                out.append(pfx + " ".join(line_buf))
-            lines.extend(out)
+        lines.append(_ACTIONS_WRAPPED.get(mtype, _DEFAULT_ACTIONS))
         lines.append("")
 
         # ── LEGAL REFERENCES ────────────────────────────────
         lines.append(_section("5. LEGAL REFERENCES"))
-        for ref in LEGAL_REFS.get(mtype, ["Section 16 CGST Act 2017"]):
-            lines.append(f"  • {ref}")
+        lines.append(_LEGAL_REFS_BLOCK.get(mtype, _DEFAULT_LEGAL_REFS))
         lines.append(f"  • CGST Act 2017 — as amended up to Finance Act 2024")
         lines.append("")
 
         # ── RISK CLASSIFICATION ─────────────────────────────
         lines.append(_section("6. RISK CLASSIFICATION & ESCALATION"))
-        escalation = {
-            "CRITICAL": "ESCALATE IMMEDIATELY to CFO and Tax Compliance Head. "
-                        "Initiate vendor audit under Section 65 CGST Act. "
-                        "Preserve all invoice evidence for potential DGGI inquiry.",
-            "HIGH":     "Escalate to Senior Tax Manager within 48 hours. "
-                        "Initiate supplier communication and set 7-day resolution deadline.",
-            "MEDIUM":   "Flag for next monthly compliance review. "
-                        "Add to vendor watch list for enhanced monitoring.",
-            "LOW":      "Record in compliance tracker. "
-                        "Review at quarterly audit cycle.",
-        }
         lines.append(f"  Risk Level  : {rlevel}")
-        lines.append(f"  Escalation  : {escalation.get(rlevel, 'Review required.')}")
-        lines.append("")
-        lines.append("─" * 72)
-        lines.append(f"  END OF AUDIT FINDING — {mid}")
-        lines.append(f"  This document is auto-generated by GraphLedger AI v1.0")
-        lines.append("─" * 72)
-
-        return "\n".join(lines)
+        lines.append(f"  Escalation  : {ESCALATION.get(rlevel, 'Review required.')}")
+        lines.append(
+            f"\n{_RULE_72}\n"
+            f"  END OF AUDIT FINDING — {mid}\n"
+            f"  This document is auto-generated by GraphLedger AI v1.0\n"
+            f"{_RULE_72}"
+        )
 
     def batch_audit_report(
         self,
         mismatches: list,
         company_name: str,
         report_period: str = "",
+        detail_level: Literal["summary", "full"] = "full",
+        parallel: bool = False,
     ) -> str:
         """
         Generate a full audit report for multiple mismatches.
         Includes executive summary, individual findings, and action priority matrix.
+        With detail_level="summary" the per-mismatch findings section is skipped.
+        With parallel=True, large batches render findings across worker processes.
         """
+        blocks = self._batch_blocks(mismatches, company_name, report_period, detail_level, parallel)
+        return "\n".join(line for block in blocks for line in block)
+
+    def stream_audit_report(
+        self,
+        mismatches: list,
+        out: TextIO,
+        company_name: str,
+        report_period: str = "",
+        detail_level: Literal["summary", "full"] = "full",
+        parallel: bool = False,
+    ) -> None:
+        """
+        Write the batch_audit_report text to `out` one finding at a time, so
+        only a single finding is held in memory instead of the whole report.
+        """
+        sep = ""
+        for block in self._batch_blocks(mismatches, company_name, report_period, detail_level, parallel):
+            out.write(sep)
+            out.write("\n".join(block))
+            sep = "\n"
+
+    def _batch_blocks(
+        self, mismatches: list, company_name: str, report_period: str,
+        detail_level: str, parallel: bool,
+    ) -> Iterator[list]:
+        """Yield the batch report as consecutive line lists: summary, one per finding, matrix."""
+        # One pass for every summary figure (risk levels, per-type counts and amounts)
+        level_counts: Counter = Counter()
+        type_counts:  Counter = Counter()
+        type_risk:    dict    = defaultdict(float)
+        total_risk = critical_risk = 0
+        for m in mismatches:
+            rlevel = m.get("risk_level")
+            t      = m.get("mismatch_type", "UNKNOWN")
+            amount = m.get("amount_at_risk", 0)
+            level_counts[rlevel] += 1
+            type_counts[t]       += 1
+            type_risk[t]         += amount
+            total_risk           += amount
+            if rlevel == "CRITICAL":
+                critical_risk += amount
+
         ts          = GENERATION_TS()
         total       = len(mismatches)
-        critical    = sum(1 for m in mismatches if m.get("risk_level") == "CRITICAL")
-        high        = sum(1 for m in mismatches if m.get("risk_level") == "HIGH")
-        total_risk  = sum(m.get("amount_at_risk", 0) for m in mismatches)
-        irn_issues  = sum(1 for m in mismatches if m.get("mismatch_type") == "IRN_MISMATCH")
+        critical    = level_counts["CRITICAL"]
+        high        = level_counts["HIGH"]
+        medium      = level_counts["MEDIUM"]
+        irn_issues  = type_counts["IRN_MISMATCH"]
 
         lines = []
         lines.append(_box("GST ITC RECONCILIATION — AUDIT REPORT", width=76))
@@ -434,7 +574,7 @@ class AuditTrailGenerator:
         lines.append(f"  Generated On    : {ts}")
         lines.append(f"  Report Engine   : GraphLedger AI v1.0 — Knowledge Graph Analysis")
         lines.append("")
-        lines.append("┌─ EXECUTIVE SUMMARY " + "─" * 52)
+        lines.append(_HDR_SUMMARY)
         lines.append(f"  Total Mismatches Found  : {total}")
         lines.append(f"  Critical Findings       : {critical}  [WARN]  IMMEDIATE ACTION REQUIRED")
         lines.append(f"  High Risk Findings      : {high}")
@@ -443,16 +583,9 @@ class AuditTrailGenerator:
         lines.append("")
 
         # Mismatch type breakdown
-        type_counts: dict = {}
-        type_risk:   dict = {}
-        for m in mismatches:
-            t = m.get("mismatch_type", "UNKNOWN")
-            type_counts[t] = type_counts.get(t, 0) + 1
-            type_risk[t]   = type_risk.get(t, 0.0) + m.get("amount_at_risk", 0)
-
-        lines.append("┌─ MISMATCH BREAKDOWN " + "─" * 51)
+        lines.append(_HDR_BREAKDOWN)
         lines.append(f"  {'Type':<25} {'Count':>6}  {'ITC at Risk':>18}  Risk")
-        lines.append(f"  {'─'*24} {'─'*6}  {'─'*18}  {'─'*8}")
+        lines.append(_BREAKDOWN_RULE)
         for t in sorted(type_counts, key=lambda x: type_risk.get(x, 0), reverse=True):
             tax_info = MISMATCH_TAXONOMY.get(t, {})
             rlevel   = tax_info.get("risk_level", "MEDIUM")
@@ -460,36 +593,47 @@ class AuditTrailGenerator:
         lines.append("")
 
         # Individual findings
-        lines.append("┌─ DETAILED FINDINGS " + "─" * 52)
-        lines.append("")
-        for idx, mismatch in enumerate(mismatches, 1):
-            lines.append(f"FINDING {idx} OF {total}")
-            lines.append(self.generate_audit_trail(mismatch))
+        if detail_level == "full":
+            lines.append(_HDR_FINDINGS)
             lines.append("")
+            yield lines
+            if parallel and total >= PARALLEL_MIN_FINDINGS and (os.cpu_count() or 1) > 1:
+                # A finding renders in ~10 µs, so only very large batches amortize
+                # worker start-up and pickling the text back
+                render = partial(self.generate_audit_trail, generated_at=ts)
+                with ProcessPoolExecutor() as ex:
+                    for idx, text in enumerate(ex.map(render, mismatches, chunksize=256), 1):
+                        yield [f"FINDING {idx} OF {total}", text, ""]
+            else:
+                for idx, mismatch in enumerate(mismatches, 1):
+                    lines = [f"FINDING {idx} OF {total}"]
+                    self._emit_audit_trail(mismatch, lines, generated_at=ts)
+                    lines.append("")
+                    yield lines
+        else:
+            yield lines
 
         # Action priority matrix
-        lines.append(_box("ACTION PRIORITY MATRIX", width=76))
+        lines = [_box("ACTION PRIORITY MATRIX", width=76)]
         lines.append(f"  {'Priority':<12} {'Action':<45} {'Count':>5}")
-        lines.append(f"  {'─'*11} {'─'*44} {'─'*5}")
+        lines.append(_MATRIX_RULE)
         if critical > 0:
             lines.append(f"  {'P1-NOW':<12} Reverse ITC for CRITICAL findings immediately     {critical:>5}")
         if irn_issues > 0:
             lines.append(f"  {'P1-NOW':<12} Report IRN fraud to DGGI                         {irn_issues:>5}")
         if high > 0:
             lines.append(f"  {'P2-48HRS':<12} Vendor notice for HIGH risk mismatches            {high:>5}")
-        medium = sum(1 for m in mismatches if m.get("risk_level") == "MEDIUM")
         if medium > 0:
             lines.append(f"  {'P3-7DAYS':<12} Monthly review for MEDIUM risk items              {medium:>5}")
         lines.append("")
-        lines.append(f"  TOTAL ITC TO REVERSE IMMEDIATELY: {_inr(sum(m.get('amount_at_risk', 0) for m in mismatches if m.get('risk_level') == 'CRITICAL'))}")
+        lines.append(f"  TOTAL ITC TO REVERSE IMMEDIATELY: {_inr(critical_risk)}")
         lines.append(f"  Total ITC at Risk (all findings) : {_inr(total_risk)}")
         lines.append("")
-        lines.append("─" * 76)
+        lines.append(_RULE_76)
         lines.append("  END OF BATCH AUDIT REPORT")
         lines.append(f"  Powered by GraphLedger AI — GST Knowledge Graph Intelligence Engine")
-        lines.append("─" * 76)
-
-        return "\n".join(lines)
+        lines.append(_RULE_76)
+        yield lines
 
 
 # --- Demo / Test -----------------------------------------------------------
@@ -6,7 +6,7 @@ The assistant can query live reconciliation data to answer
 questions about invoices, vendors, fraud patterns, and ITC risk.
 
 Architecture:
-  User message → Groq LLM (llama-3.3-70b-versatile)
+  User message → Groq LLM (speed tier picked per turn, see SPEED_MAP)
                → [optional] Tool calls → backend data functions
                → Final natural-language response
 
@@ -14,26 +14,33 @@ GST Context embedded in system prompt so the LLM understands
 Indian GST terminology without external training.
 """
 
-import json
+import asyncio
 import os
-from typing import Optional
+import re
+import threading
+from collections import OrderedDict
+from datetime import date
+from typing import AsyncIterator, Callable, Optional
 
+import orjson
 from dotenv import load_dotenv
-from groq import Groq
+from groq import AsyncGroq, DefaultAioHttpClient
 
 load_dotenv()
 
 # ─── Groq client (singleton) ─────────────────────────────────────────────────
-_client: Optional[Groq] = None
+# Async client on the aiohttp transport: concurrent chat sessions share the
+# event loop while waiting on Groq instead of holding one thread each.
+_aclient: Optional[AsyncGroq] = None
 
-def get_client() -> Groq:
-    global _client
-    if _client is None:
+async def get_aclient() -> AsyncGroq:
+    global _aclient
+    if _aclient is None:
         api_key = os.getenv("GROQ_API_KEY")
         if not api_key:
             raise ValueError("GROQ_API_KEY not set in environment")
-        _client = Groq(api_key=api_key)
-    return _client
+        _aclient = AsyncGroq(api_key=api_key, http_client=DefaultAioHttpClient())
+    return _aclient
 
 
 # ─── Tool definitions (function calling schema) ───────────────────────────────
@@ -176,30 +183,114 @@ You help finance teams, GST officers, and compliance managers:
 """
 
 
+# ─── GST rule explanations (explain_gst_rule) ─────────────────────────────────
+GST_RULE_EXPLANATIONS = {
+    "SECTION 16(2)(AA)": (
+        "ITC is admissible ONLY when the invoice/debit note appears in the recipient's "
+        "GSTR-2B. Inserted by Finance Act 2021. Effectively makes GSTR-2B the single source "
+        "of truth for ITC eligibility. If your supplier doesn't file GSTR-1, the invoice "
+        "won't appear in your 2B → ITC blocked."
+    ),
+    "RULE 36(4)": (
+        "Provisional ITC claim is capped at 105% of the ITC appearing in GSTR-2B. "
+        "Any excess provisional ITC must be reversed in GSTR-3B of the same period."
+    ),
+    "GSTR-1": (
+        "Outward Supplies Return. Filed by SUPPLIER by 11th of next month (quarterly for QRMP). "
+        "Contains invoice-level details which auto-populate buyer's GSTR-2B."
+    ),
+    "GSTR-2B": (
+        "Auto-populated ITC statement generated by GSTN on 14th of each month. "
+        "Based on suppliers' GSTR-1 filings. Buyer cannot modify it. "
+        "Under Section 16(2)(aa), this is the eligibility gate for ITC."
+    ),
+    "GSTR-3B": (
+        "Monthly summary return filed by BUYER by 20th. Declares output tax liability "
+        "and ITC claimed. ITC claimed here should match GSTR-2B to avoid notices."
+    ),
+    "IRN": (
+        "Invoice Reference Number — a unique 64-character hash generated by the IRP "
+        "(Invoice Registration Portal) under e-Invoicing. Mandatory for B2B invoices "
+        "above ₹5 Cr turnover threshold (progressively reduced). Invalid IRN = "
+        "invoice not recognized by GSTN = ITC blocked."
+    ),
+    "ITC": (
+        "Input Tax Credit — the GST paid on purchases that a business can offset "
+        "against its GST collected on sales. The chain: Supplier collects GST → "
+        "files GSTR-1 → Buyer sees it in GSTR-2B → Buyer claims ITC in GSTR-3B."
+    ),
+    "E-WAY BILL": (
+        "Electronic waybill required for movement of goods exceeding ₹50,000 in value. "
+        "Generated on ewaybillgst.gov.in. Must be linked to invoice. Missing EWB = "
+        "invoice validity questionable = ITC at risk."
+    ),
+}
+
+# Each word of a key ("RULE", "36(4)", "BILL", …) → that key; built once at import
+_RULE_TOKENS = {word: key for key in GST_RULE_EXPLANATIONS for word in key.split()}
+_TOKEN_PUNCT = ".,?!:;'\""
+
+
+def _lookup_gst_rule(rule: str) -> Optional[str]:
+    """Explanation for an upper-cased rule query, or None. Several hits → first key in table order."""
+    explanation = GST_RULE_EXPLANATIONS.get(rule.strip())
+    if explanation is not None:
+        return explanation
+    hits = {_RULE_TOKENS[tok] for word in rule.split()
+            if (tok := word.strip(_TOKEN_PUNCT)) in _RULE_TOKENS}
+    for key in GST_RULE_EXPLANATIONS:
+        if key in hits:
+            return GST_RULE_EXPLANATIONS[key]
+    return None
+
+
 # ─── Tool executor (calls actual data functions) ──────────────────────────────
+def _dumps(obj) -> str:
+    return orjson.dumps(obj).decode()
+
+
+# Tool results keyed on (tool, args, kg identity + graph version, day) — a
+# repeated question against unchanged data is a dict hit. The day is part of
+# the key because the dashboard's 180-day overdue figure moves with the date.
+TOOL_CACHE_MAX = 256
+_tool_cache: "OrderedDict[tuple, str]" = OrderedDict()
+_tool_cache_lock = threading.Lock()  # tools run in worker threads
+
+
 def execute_tool(tool_name: str, args: dict, kg, predictor) -> str:
     """
     Execute a tool call by name. Returns JSON string result.
     kg = GSTKnowledgeGraph instance
     predictor = VendorRiskPredictor instance
     """
+    try:
+        key = (tool_name, tuple(sorted(args.items())), id(kg), kg._graph_version, date.today())
+        hash(key)
+    except TypeError:  # non-scalar argument values — just run it
+        return _execute_tool(tool_name, args, kg, predictor)
+
+    with _tool_cache_lock:
+        result = _tool_cache.get(key)
+        if result is not None:
+            _tool_cache.move_to_end(key)
+            return result
+    result = _execute_tool(tool_name, args, kg, predictor)
+    with _tool_cache_lock:
+        _tool_cache[key] = result
+        while len(_tool_cache) > TOOL_CACHE_MAX:
+            _tool_cache.popitem(last=False)
+    return result
+
+
+def _execute_tool(tool_name: str, args: dict, kg, predictor) -> str:
     try:
         if tool_name == "get_dashboard_summary":
-            from datetime import date, datetime
+            # Aggregates are precomputed on load — no per-call scans
             mis = kg.mismatches
-            total_risk = sum(m["amount_at_risk"] for m in mis)
-            by_level = {}
-            for m in mis:
-                lvl = m["risk_level"]
-                by_level[lvl] = by_level.get(lvl, 0) + 1
-            overdue_invoices = [
-                inv for inv in kg.invoices
-                if inv["invoice_id"] not in kg._pay_by_inv
-                and (date.today() - datetime.strptime(inv["invoice_date"], "%Y-%m-%d").date()).days > 180
-                and (inv["igst"] + inv["cgst"] + inv["sgst"]) > 0
-            ]
-            overdue_itc = sum(i["igst"] + i["cgst"] + i["sgst"] for i in overdue_invoices)
-            return json.dumps({
+            total_risk = kg.mis_total_risk
+            by_level = {lvl: b["count"] for lvl, b in kg.mis_by_level.items()}
+            overdue_count, overdue_itc = kg.overdue_itc(180)
+            return _dumps({
                 "total_invoices": len(kg.invoices),
                 "total_mismatches": len(mis),
                 "total_itc_at_risk_inr": total_risk,
@@ -211,7 +302,7 @@ def execute_tool(tool_name: str, args: dict, kg, predictor) -> str:
                     1 for v in kg.vendors
                     if v.get("compliance_score", 100) < 40
                 ),
-                "payment_overdue_180d_count": len(overdue_invoices),
+                "payment_overdue_180d_count": overdue_count,
                 "payment_overdue_itc_lakh": round(overdue_itc / 100000, 2),
             })
 
@@ -220,7 +311,7 @@ def execute_tool(tool_name: str, args: dict, kg, predictor) -> str:
             limit = int(args.get("limit", 5))
             mis = [m for m in kg.mismatches if m["risk_level"] == risk]
             mis_sorted = sorted(mis, key=lambda x: x["amount_at_risk"], reverse=True)[:limit]
-            return json.dumps({
+            return _dumps({
                 "risk_level": risk,
                 "count": len(mis),
                 "shown": len(mis_sorted),
@@ -242,11 +333,11 @@ def execute_tool(tool_name: str, args: dict, kg, predictor) -> str:
 
         elif tool_name == "get_vendor_risk_report":
             search = args.get("vendor_name", "").lower()
-            vendors = list(kg.vendors)
+            # Both come back sorted by compliance_score ascending (worst first)
             if search and search not in ("all", ""):
-                vendors = [v for v in vendors if search in v.get("name", "").lower()]
-            # Sort by compliance_score ascending (worst first)
-            vendors = sorted(vendors, key=lambda v: v.get("compliance_score", 100))
+                vendors = kg.search_vendors(search)
+            else:
+                vendors = kg._vendors_by_score
             result = []
             for v in vendors[:10]:
                 score = v.get("compliance_score", 50)  # score is 0–100
@@ -264,7 +355,7 @@ def execute_tool(tool_name: str, args: dict, kg, predictor) -> str:
                     "itc_at_risk_lakh": round(v.get("total_itc_at_risk", 0) / 100000, 2),
                     "sector": v.get("sector", "-"),
                 })
-            return json.dumps({"vendors": result, "total_searched": len(vendors)})
+            return _dumps({"vendors": result, "total_searched": len(vendors)})
 
         elif tool_name == "get_fraud_alerts":
             clusters = kg.find_risk_clusters()
@@ -278,7 +369,7 @@ def execute_tool(tool_name: str, args: dict, kg, predictor) -> str:
                 for v in kg.vendors
                 if v.get("compliance_score", 100) < 30
             ][:5]
-            return json.dumps({
+            return _dumps({
                 "circular_trading_flags": len(circular),
                 "risk_clusters": clusters[:5],
                 "critically_low_score_vendors": high_risk_vendors,
@@ -286,14 +377,12 @@ def execute_tool(tool_name: str, args: dict, kg, predictor) -> str:
             })
 
         elif tool_name == "get_itc_reversal_estimate":
-            mis = kg.mismatches
-            critical = [m for m in mis if m["risk_level"] == "CRITICAL"]
-            high = [m for m in mis if m["risk_level"] == "HIGH"]
-            critical_amt = sum(m["amount_at_risk"] for m in critical)
-            high_amt = sum(m["amount_at_risk"] for m in high)
+            by_level = kg.mis_by_level
+            critical_amt = by_level.get("CRITICAL", {}).get("total_itc_at_risk", 0)
+            high_amt = by_level.get("HIGH", {}).get("total_itc_at_risk", 0)
             # 18% p.a. interest for 6 months on critical items
             interest = critical_amt * 0.18 * (6 / 12)
-            return json.dumps({
+            return _dumps({
                 "must_reverse_immediately_lakh": round(critical_amt / 100000, 2),
                 "probable_reversal_lakh": round(high_amt / 100000, 2),
                 "interest_liability_lakh": round(interest / 100000, 2),
@@ -304,52 +393,10 @@ def execute_tool(tool_name: str, args: dict, kg, predictor) -> str:
 
         elif tool_name == "explain_gst_rule":
             rule = args.get("rule", "").upper()
-            explanations = {
-                "SECTION 16(2)(AA)": (
-                    "ITC is admissible ONLY when the invoice/debit note appears in the recipient's "
-                    "GSTR-2B. Inserted by Finance Act 2021. Effectively makes GSTR-2B the single source "
-                    "of truth for ITC eligibility. If your supplier doesn't file GSTR-1, the invoice "
-                    "won't appear in your 2B → ITC blocked."
-                ),
-                "RULE 36(4)": (
-                    "Provisional ITC claim is capped at 105% of the ITC appearing in GSTR-2B. "
-                    "Any excess provisional ITC must be reversed in GSTR-3B of the same period."
-                ),
-                "GSTR-1": (
-                    "Outward Supplies Return. Filed by SUPPLIER by 11th of next month (quarterly for QRMP). "
-                    "Contains invoice-level details which auto-populate buyer's GSTR-2B."
-                ),
-                "GSTR-2B": (
-                    "Auto-populated ITC statement generated by GSTN on 14th of each month. "
-                    "Based on suppliers' GSTR-1 filings. Buyer cannot modify it. "
-                    "Under Section 16(2)(aa), this is the eligibility gate for ITC."
-                ),
-                "GSTR-3B": (
-                    "Monthly summary return filed by BUYER by 20th. Declares output tax liability "
-                    "and ITC claimed. ITC claimed here should match GSTR-2B to avoid notices."
-                ),
-                "IRN": (
-                    "Invoice Reference Number — a unique 64-character hash generated by the IRP "
-                    "(Invoice Registration Portal) under e-Invoicing. Mandatory for B2B invoices "
-                    "above ₹5 Cr turnover threshold (progressively reduced). Invalid IRN = "
-                    "invoice not recognized by GSTN = ITC blocked."
-                ),
-                "ITC": (
-                    "Input Tax Credit — the GST paid on purchases that a business can offset "
-                    "against its GST collected on sales. The chain: Supplier collects GST → "
-                    "files GSTR-1 → Buyer sees it in GSTR-2B → Buyer claims ITC in GSTR-3B."
-                ),
-                "E-WAY BILL": (
-                    "Electronic waybill required for movement of goods exceeding ₹50,000 in value. "
-                    "Generated on ewaybillgst.gov.in. Must be linked to invoice. Missing EWB = "
-                    "invoice validity questionable = ITC at risk."
-                ),
-            }
-            # Fuzzy match
-            for key, explanation in explanations.items():
-                if key in rule or any(word in rule for word in key.split()):
-                    return json.dumps({"rule": rule, "explanation": explanation})
-            return json.dumps({
+            explanation = _lookup_gst_rule(rule)
+            if explanation is not None:
+                return _dumps({"rule": rule, "explanation": explanation})
+            return _dumps({
                 "rule": rule,
                 "explanation": (
                     f"I don't have a pre-built explanation for '{rule}'. "
@@ -359,123 +406,274 @@ def execute_tool(tool_name: str, args: dict, kg, predictor) -> str:
             })
 
         else:
-            return json.dumps({"error": f"Unknown tool: {tool_name}"})
+            return _dumps({"error": f"Unknown tool: {tool_name}"})
 
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return _dumps({"error": str(e)})
+
+
+# ─── Data-query detection ─────────────────────────────────────────────────────
+# Any of these anywhere in the message (plain substring, so "vendors" and
+# "risky" count) means the turn needs live data. One compiled alternation
+# scans the message once instead of once per keyword.
+_DATA_KEYWORDS = (
+    "vendor", "invoice", "risk", "critical", "high", "itc", "fraud",
+    "circular", "reversal", "summary", "dashboard", "mismatch",
+    "compliance", "gstr", "filing", "score", "report", "list",
+    "show", "display", "how many", "total", "amount", "lakh", "crore",
+)
+_DATA_RE = re.compile("|".join(map(re.escape, _DATA_KEYWORDS)), re.IGNORECASE)
+
+
+# ─── Model speed tiers ────────────────────────────────────────────────────────
+# instant: conversational / GST-law turns · balanced: synthesis over tool data
+# heavy: turns that must call tools (most reliable function calling)
+SPEED_MAP = {
+    "instant":  "llama-3.1-8b-instant",
+    "balanced": "llama-3.3-70b-versatile",
+    "heavy":    "openai/gpt-oss-120b",
+}
+
+
+# ─── Prefix-cache warm-up ─────────────────────────────────────────────────────
+async def warm_prefix_cache(models: tuple[str, ...] = tuple(SPEED_MAP.values())) -> None:
+    """
+    Prime Groq's prompt cache with SYSTEM_PROMPT + TOOLS, one tiny request per model.
+
+    Every chat request opens with this exact string and sends the same tool
+    definitions (live data only ever goes in the final user message), so
+    later calls can skip prefilling them.
+    Best-effort: a missing key or API error just means a cold first request.
+    """
+    if not os.getenv("GROQ_API_KEY"):
+        return
+    client = await get_aclient()
+    for model in models:
+        try:
+            await client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": "ready?"},
+                ],
+                tools=TOOLS,
+                tool_choice="none",
+                max_tokens=1,
+            )
+        except Exception:
+            pass
+
+
+# ─── History compaction ───────────────────────────────────────────────────────
+# History is re-sent (and prefilled) on every turn. Once the estimate passes
+# the budget, the oldest half is folded into a one-line "Prior context" note
+# written by the instant tier; an earlier note is folded into the new one.
+HISTORY_TOKEN_BUDGET = 2000  # estimated as characters // 4
+SUMMARY_CACHE_MAX = 256
+_PRIOR_CONTEXT = "Prior context: "
+_summary_cache: "OrderedDict[tuple, str]" = OrderedDict()  # exact folded prefix → summary
+
+
+async def compact_history(history: list[dict], client: AsyncGroq) -> list[dict]:
+    """Return history trimmed for re-sending; falls back to the un-summarised history on API errors."""
+    if sum(len(m.get("content") or "") for m in history) // 4 <= HISTORY_TOKEN_BUDGET:
+        return history
+
+    # A previous note sits in front of the user/assistant pairs — take it out
+    # so the halving below never splits a question from its answer.
+    note = None
+    turns = history
+    if history and history[0].get("role") == "system":
+        note, turns = history[0], history[1:]
+    half = len(turns) // 2
+    half -= half % 2  # keep user/assistant pairs together
+    if half == 0:
+        return history
+    old, recent = turns[:half], turns[half:]
+    if note is not None:
+        old = [note, *old]
+    key = tuple((m["role"], m.get("content") or "") for m in old)
+    summary = _summary_cache.get(key)
+    if summary is None:
+        transcript = "\n".join(f"{role}: {content}" for role, content in key)
+        try:
+            response = await client.chat.completions.create(
+                model=SPEED_MAP["instant"],
+                messages=[
+                    {"role": "system", "content": (
+                        "Summarise this GST assistant conversation in one line. Keep vendor "
+                        "names, GSTINs, invoice numbers, amounts and open questions."
+                    )},
+                    {"role": "user", "content": transcript},
+                ],
+                max_tokens=150,
+                temperature=0,
+            )
+        except Exception:
+            return history
+        summary = (response.choices[0].message.content or "").strip()
+        _summary_cache[key] = summary
+        while len(_summary_cache) > SUMMARY_CACHE_MAX:
+            _summary_cache.popitem(last=False)
+    return [{"role": "system", "content": _PRIOR_CONTEXT + summary}, *recent]
 
 
 # ─── Main chat function ────────────────────────────────────────────────────────
-def chat(
+async def chat_stream(
     user_message: str,
     history: list[dict],
     kg,
     predictor,
-    model: str = "openai/gpt-oss-120b",
-) -> tuple[str, list[dict]]:
+    model: Optional[str] = None,
+    on_complete: Optional[Callable[[str, list[dict]], None]] = None,
+) -> AsyncIterator[str]:
     """
-    Send a message to Groq and return (reply_text, updated_history).
-
-    Uses openai/gpt-oss-120b — OpenAI's model hosted on Groq.
-    Excellent function/tool calling reliability (same family as GPT-4o).
+    Send a message to Groq and yield the reply text as it is generated.
+    Once the reply is complete, on_complete(reply_text, updated_history)
+    is called so the caller can persist the session.
 
     Uses tool_choice="required" for data-related queries so the model MUST
     call a tool instead of hallucinating. Falls back to "auto" for pure
     conversational / GST law explanation messages.
+
+    Model is picked per call from SPEED_MAP: data queries go to the "heavy"
+    tier (openai/gpt-oss-120b, the most reliable tool caller), everything
+    else to "instant", and the synthesis call to "balanced". An explicit
+    `model` overrides the routing for both calls.
     """
-    client = get_client()
+    client = await get_aclient()
 
     # Force tool use for data queries — prevents the model from hallucinating
     # vendor names / invoice IDs instead of calling the actual tool.
-    _DATA_KEYWORDS = {
-        "vendor", "invoice", "risk", "critical", "high", "itc", "fraud",
-        "circular", "reversal", "summary", "dashboard", "mismatch",
-        "compliance", "gstr", "filing", "score", "report", "list",
-        "show", "display", "how many", "total", "amount", "lakh", "crore",
-    }
-    lower_msg = user_message.lower()
-    tool_choice = (
-        "required"
-        if any(kw in lower_msg for kw in _DATA_KEYWORDS)
-        else "auto"
-    )
+    tool_choice = "required" if _DATA_RE.search(user_message) else "auto"
+    call1_model = model or SPEED_MAP["heavy" if tool_choice == "required" else "instant"]
+    call2_model = model or SPEED_MAP["balanced"]
 
-    # Build message list: system + history + new user message
+    # Build message list: system + compacted history + new user message
     messages = [{"role": "system", "content": SYSTEM_PROMPT}]
-    messages.extend(history)
+    messages.extend(await compact_history(history, client))
     messages.append({"role": "user", "content": user_message})
 
     reply = ""
 
     # ── Call 1: allow tool use ────────────────────────────────────────────────
-    response = client.chat.completions.create(
-        model=model,
+    response = await client.chat.completions.create(
+        model=call1_model,
         messages=messages,
         tools=TOOLS,
         tool_choice=tool_choice,
         max_tokens=1024,
         temperature=0.3,
+        stream=True,
     )
 
-    assistant_msg = response.choices[0].message
-    content = assistant_msg.content or ""
+    # Data turns are expected to come back as tool calls, so any text is held
+    # for the <function> guard; conversational turns stream straight through.
+    relay = tool_choice != "required"
+    content_parts: list[str] = []
+    tool_calls: dict[int, list[str]] = {}  # index → [id, name, arguments] — streamed in fragments
+    async for chunk in response:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta
+        for tc in delta.tool_calls or ():
+            call = tool_calls.setdefault(tc.index, ["", "", ""])
+            call[0] += tc.id or ""
+            if tc.function is not None:
+                call[1] += tc.function.name or ""
+                call[2] += tc.function.arguments or ""
+        if delta.content:
+            content_parts.append(delta.content)
+            if relay:
+                yield delta.content
+    content = "".join(content_parts)
 
     # Guard: hallucinated <function> tags → no real tool call made
-    if "<function>" in content and not assistant_msg.tool_calls:
+    if "<function>" in content and not tool_calls:
         reply = (
             "I need to look up live data for that. "
             "Please ensure the backend is running (`python api.py`) and try again."
         )
+        yield ("\n\n" + reply) if relay else reply
         messages.append({"role": "assistant", "content": reply})
-    elif assistant_msg.tool_calls:
-        # Execute every tool call and collect (name, result) pairs
-        tool_results: list[tuple[str, str]] = []
-        for tc in assistant_msg.tool_calls:
-            fn_args = json.loads(tc.function.arguments or "{}")
-            result = execute_tool(tc.function.name, fn_args, kg, predictor)
-            tool_results.append((tc.function.name, result))
-
-        # ── Call 2: synthesis prompt — NO tool_calls in history ───────────────
-        # openai/gpt-oss-120b on Groq will ALWAYS try to call a tool again if
-        # the history contains assistant messages with tool_calls — even when
-        # tools= is omitted. Fix: build a completely fresh message list that
-        # embeds the tool results as plain text so the model has no reason
-        # (or ability) to make another tool call.
-        data_block = "\n\n".join(
-            f"[{name} result]\n{result}" for name, result in tool_results
+    elif tool_calls:
+        calls = [tool_calls[i] for i in sorted(tool_calls)]
+
+        # Execute the tool calls concurrently, off the event loop; gather keeps
+        # the results in the order the model issued the calls
+        async def run_one(name: str, arguments: str) -> str:
+            fn_args = orjson.loads(arguments or "{}")
+            return await asyncio.to_thread(execute_tool, name, fn_args, kg, predictor)
+
+        tool_results: list[str] = await asyncio.gather(
+            *(run_one(name, arguments) for _, name, arguments in calls)
         )
+
+        # ── Call 2: answer from the tool results ──────────────────────────────
+        # Standard tool-message format: Call 1's messages stay a verbatim
+        # prefix, then the assistant's tool_calls and one "tool" message per
+        # result. tool_choice="none" on the balanced tier stops the model from
+        # calling tools again. The exchange itself is not kept in history.
         synthesis_messages = [
-            {"role": "system", "content": SYSTEM_PROMPT},
-            # Keep prior plain-text conversation turns (no tool_calls entries)
-            *[
-                m for m in messages[1:]
-                if m.get("role") in ("user", "assistant")
-                and not m.get("tool_calls")
-            ],
+            *messages,
             {
-                "role": "user",
-                "content": (
-                    f"Original question: {user_message}\n\n"
-                    f"Live data retrieved from reconciliation engine:\n{data_block}\n\n"
-                    "Using ONLY the data above, provide a clear, well-formatted answer."
-                ),
+                "role": "assistant",
+                "content": content or None,
+                "tool_calls": [
+                    {"id": call_id, "type": "function",
+                     "function": {"name": name, "arguments": arguments}}
+                    for call_id, name, arguments in calls
+                ],
             },
+            *(
+                {"role": "tool", "tool_call_id": call_id, "content": result}
+                for (call_id, _, _), result in zip(calls, tool_results)
+            ),
         ]
-        response2 = client.chat.completions.create(
-            model=model,
+        response2 = await client.chat.completions.create(
+            model=call2_model,
             messages=synthesis_messages,
+            tools=TOOLS,
+            tool_choice="none",
             max_tokens=1024,
             temperature=0.3,
+            stream=True,
         )
-        reply = response2.choices[0].message.content or ""
+        reply_parts: list[str] = []
+        async for chunk in response2:
+            if chunk.choices and chunk.choices[0].delta.content:
+                reply_parts.append(chunk.choices[0].delta.content)
+                yield chunk.choices[0].delta.content
+        reply = "".join(reply_parts)
         messages.append({"role": "assistant", "content": reply})
     else:
         # Model answered directly without needing a tool call
         reply = content
+        if not relay:
+            yield content
         messages.append({"role": "assistant", "content": reply})
     # ── end ──────────────────────────────────────────────────────────────────
 
     # Build updated history (exclude system prompt), keep last 20 messages
     # to avoid carrying stale tool exchanges into future turns.
     new_history = messages[1:][-20:]
+    if on_complete is not None:
+        on_complete(reply, new_history)
+
+
+async def chat(
+    user_message: str,
+    history: list[dict],
+    kg,
+    predictor,
+    model: Optional[str] = None,
+) -> tuple[str, list[dict]]:
+    """Buffered chat_stream: return (reply_text, updated_history) once the reply is complete."""
+    done: list = []
+    async for _ in chat_stream(
+        user_message, history, kg, predictor, model,
+        on_complete=lambda reply, new_history: done.extend((reply, new_history)),
+    ):
+        pass
+    reply, new_history = done
     return reply, new_history
@@ -488,10 +488,16 @@ def generate_all() -> dict:
         "payments":   payments,
     }
 
-    for key, records in data.items():
+    # invoices.json doubles as the "data present" marker (see api.startup), so it
+    # is written last, and every file goes through a temp file + atomic rename
+    # so a concurrently starting worker never loads a half-written file
+    for key in sorted(data, key=lambda k: k == "invoices"):
+        records = data[key]
         path = DATA_DIR / f"{key}.json"
-        with open(path, "w", encoding="utf-8") as f:
+        tmp  = path.with_suffix(".json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
             json.dump(records, f, indent=2, default=str)
+        os.replace(tmp, path)
         print(f"  [OK] {path.name}: {len(records)} records")
 
     print(f"\n[Summary]")
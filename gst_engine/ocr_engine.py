@@ -2,11 +2,13 @@
 GST Invoice OCR Engine
 Extracts structured data from PDF invoices and validates against GSTR-2B
 """
+import io
 import re
 import json
 import hashlib
 from datetime import datetime
 from pathlib import Path
+from typing import BinaryIO, Union
 
 try:
     import pdfplumber
@@ -17,7 +19,6 @@ except ImportError:
 try:
     import pytesseract
     from PIL import Image
-    import io
     TESSERACT_AVAILABLE = True
 except ImportError:
     TESSERACT_AVAILABLE = False
@@ -37,6 +38,14 @@ EWB_PATTERN   = re.compile(r'(?:E-?Way\s*Bill\s*(?:No|Number)?[.:\s]*)(\d{12})',
 PO_PATTERN    = re.compile(r'(?:PO\s*(?:No|Number)?[.:\s]*)([A-Z0-9\-/]+)', re.IGNORECASE)
 
 
+def _as_stream(data: Union[bytes, BinaryIO]) -> BinaryIO:
+    """Accept raw bytes or an already-open binary file (e.g. a spooled upload)."""
+    if isinstance(data, (bytes, bytearray)):
+        return io.BytesIO(data)
+    data.seek(0)
+    return data
+
+
 def _clean_amount(s: str) -> float:
     """Convert '1,23,456.78' → 123456.78"""
     try:
@@ -58,15 +67,15 @@ class InvoiceOCREngine:
 
     # ── Public API ─────────────────────────────────────────────────
 
-    def extract_from_pdf(self, file_bytes: bytes, filename: str = "invoice.pdf") -> dict:
-        """Extract invoice fields from a PDF file (digital or scanned)."""
+    def extract_from_pdf(self, file: Union[bytes, BinaryIO], filename: str = "invoice.pdf") -> dict:
+        """Extract invoice fields from a PDF file (digital or scanned), given bytes or a file object."""
         text = ""
         pages_info = []
+        stream = _as_stream(file)
 
         if PDF_AVAILABLE:
             try:
-                import io as _io
-                with pdfplumber.open(_io.BytesIO(file_bytes)) as pdf:
+                with pdfplumber.open(stream) as pdf:
                     for i, page in enumerate(pdf.pages):
                         page_text = page.extract_text() or ""
                         text += page_text + "\n"
@@ -82,7 +91,8 @@ class InvoiceOCREngine:
         if len(text.strip()) < 50 and TESSERACT_AVAILABLE:
             try:
                 from pdf2image import convert_from_bytes
-                images = convert_from_bytes(file_bytes, dpi=200)
+                stream.seek(0)
+                images = convert_from_bytes(stream.read(), dpi=200)
                 for img in images:
                     text += pytesseract.image_to_string(img) + "\n"
             except Exception:
@@ -90,12 +100,12 @@ class InvoiceOCREngine:
 
         return self._build_result(text, filename, pages_info, source="pdf")
 
-    def extract_from_image(self, file_bytes: bytes, filename: str = "invoice.png") -> dict:
-        """Extract invoice fields from an image (PNG/JPG)."""
+    def extract_from_image(self, file: Union[bytes, BinaryIO], filename: str = "invoice.png") -> dict:
+        """Extract invoice fields from an image (PNG/JPG), given bytes or a file object."""
         text = ""
         if TESSERACT_AVAILABLE:
             try:
-                img = Image.open(io.BytesIO(file_bytes))
+                img = Image.open(_as_stream(file))
                 text = pytesseract.image_to_string(img)
             except Exception as e:
                 text = f"IMG_ERROR: {e}"
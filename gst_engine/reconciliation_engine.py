@@ -22,10 +22,11 @@ Production path:
 
 import json
 import networkx as nx
+from bisect import bisect_left
 from pathlib import Path
 from collections import defaultdict, deque
 from datetime import date, datetime, timedelta
-from typing import Optional
+from typing import Any, Optional
 
 from schema import MISMATCH_TAXONOMY
 
@@ -65,7 +66,31 @@ class GSTKnowledgeGraph:
         self._inv_by_buyer:  dict  = defaultdict(list)  # (buyer_gstin, period) → invoices
         self._inv_by_sup:    dict  = defaultdict(list)  # (supplier_gstin, period) → invoices
         self._mis_by_inv:    dict  = defaultdict(list)  # invoice_id → mismatches
+        self._mis_by_gstin:  dict  = defaultdict(list)  # gstin (supplier or buyer) → mismatches
         self._pay_by_inv:    dict  = {}  # invoice_id → payment dict (single payment per invoice)
+        self._gstin_set:     frozenset = frozenset()  # raw GSTINs that have a gstin_* node
+        # Filter buckets; mismatch buckets are ordered by amount_at_risk desc
+        self._mis_by_risk_amt:  list = []
+        self._mis_by_risk:      dict = defaultdict(list)  # risk_level → mismatches
+        self._mis_by_type:      dict = defaultdict(list)  # mismatch_type → mismatches
+        self._vendors_by_cat:   dict = defaultdict(list)  # risk_category → vendors
+        self._vendors_by_sector:dict = defaultdict(list)  # sector (lower-case) → vendors
+        self._vendors_by_score: list = []  # compliance_score ascending (worst first)
+        self._vendor_trigrams:  dict = defaultdict(set)  # name trigram (lower-case) → _vendors_by_score positions
+
+        # Graph-wide snapshots, reused until the graph is rebuilt (_graph_version bump)
+        self._graph_version:  int   = 0
+        self._snapshots:      dict  = {}  # name → (graph_version, result)
+
+        # Mismatch aggregates (mismatches are read-only after load)
+        self.mis_total_risk:  float = 0.0
+        self.mis_critical:    int   = 0
+        self.mis_resolved:    int   = 0
+        self.mis_by_type:     dict  = {}  # mismatch_type → {count, total_itc_at_risk}
+        self.mis_by_level:    dict  = {}  # risk_level → {count, total_itc_at_risk}
+        # Unpaid invoices carrying tax, oldest first, with running ITC — see overdue_itc
+        self._unpaid_dates:   list  = []  # invoice_date (ISO string, sortable)
+        self._unpaid_itc_cum: list  = [0.0]  # _unpaid_itc_cum[i] = ITC of the i oldest
 
     # ──────────────────────────────────────────────────────────
     # DATA LOADING
@@ -110,10 +135,56 @@ class GSTKnowledgeGraph:
         for m in self.mismatches:
             self._mis_index[m["mismatch_id"]] = m
             self._mis_by_inv[m["invoice_id"]].append(m)
+            self._mis_by_gstin[m["supplier_gstin"]].append(m)
+            buyer = m.get("buyer_gstin")
+            if buyer and buyer != m["supplier_gstin"]:
+                self._mis_by_gstin[buyer].append(m)
+
+            at_risk = m["amount_at_risk"]
+            self.mis_total_risk += at_risk
+            if m["risk_level"] == "CRITICAL":
+                self.mis_critical += 1
+            if m["resolution_status"] == "RESOLVED":
+                self.mis_resolved += 1
+            bucket = self.mis_by_type.get(m["mismatch_type"])
+            if bucket is None:
+                bucket = self.mis_by_type[m["mismatch_type"]] = {"count": 0, "total_itc_at_risk": 0.0}
+            bucket["count"]             += 1
+            bucket["total_itc_at_risk"] += at_risk
+            bucket = self.mis_by_level.get(m["risk_level"])
+            if bucket is None:
+                bucket = self.mis_by_level[m["risk_level"]] = {"count": 0, "total_itc_at_risk": 0.0}
+            bucket["count"]             += 1
+            bucket["total_itc_at_risk"] += at_risk
 
         for pay in self.payments:
             self._pay_by_inv[pay["invoice_id"]] = pay
 
+        unpaid = sorted(
+            (inv["invoice_date"], itc)
+            for inv in self.invoices
+            if inv["invoice_id"] not in self._pay_by_inv
+            and (itc := inv["igst"] + inv["cgst"] + inv["sgst"]) > 0
+        )
+        self._unpaid_dates = [d for d, _ in unpaid]
+        for _, itc in unpaid:
+            self._unpaid_itc_cum.append(self._unpaid_itc_cum[-1] + itc)
+
+        self._mis_by_risk_amt = sorted(self.mismatches, key=lambda m: m["amount_at_risk"], reverse=True)
+        for m in self._mis_by_risk_amt:
+            self._mis_by_risk[m["risk_level"]].append(m)
+            self._mis_by_type[m["mismatch_type"]].append(m)
+
+        for v in self.vendors:
+            self._vendors_by_cat[v["risk_category"]].append(v)
+            self._vendors_by_sector[v.get("sector", "").lower()].append(v)
+
+        self._vendors_by_score = sorted(self.vendors, key=lambda v: v.get("compliance_score", 100))
+        for pos, v in enumerate(self._vendors_by_score):
+            name = v.get("name", "").lower()
+            for i in range(len(name) - 2):
+                self._vendor_trigrams[name[i:i + 3]].add(pos)
+
     def _build_graph(self):
         """
         Construct NetworkX DiGraph from loaded data.
@@ -127,6 +198,8 @@ class GSTKnowledgeGraph:
           Return:        ret_{return_id}
           MismatchEvent: mis_{mismatch_id}
         """
+        self._graph_version += 1
+
         # ── Taxpayer + GSTIN nodes ─────────────────────────
         for tp in self.taxpayers:
             tp_id = f"tp_{tp['taxpayer_id']}"
@@ -227,6 +300,9 @@ class GSTKnowledgeGraph:
                     is_overdue=pay["is_overdue"],
                 )
 
+        # Includes GSTINs only ever seen as invoice parties (nodes created by add_edge)
+        self._gstin_set = frozenset(n[6:] for n in self.G if n.startswith("gstin_"))
+
     # ──────────────────────────────────────────────────────────
     # RECONCILIATION ENGINE
     # ──────────────────────────────────────────────────────────
@@ -611,7 +687,43 @@ class GSTKnowledgeGraph:
             "chain_hops":         hops_data,
         }
 
+    def search_vendors(self, search: str) -> list[dict]:
+        """
+        Vendors whose name contains `search` (case-insensitive), worst
+        compliance score first. Candidates come from intersecting the name
+        trigram postings, then get a substring check. Searches shorter than
+        three characters fall back to a scan of the score-sorted list.
+        """
+        search = search.lower()
+        if len(search) < 3:
+            candidates = self._vendors_by_score
+        else:
+            postings = [self._vendor_trigrams.get(search[i:i + 3], set()) for i in range(len(search) - 2)]
+            candidates = [self._vendors_by_score[pos] for pos in sorted(set.intersection(*postings))]
+        return [v for v in candidates if search in v.get("name", "").lower()]
+
+    def overdue_itc(self, days: int = 180) -> tuple[int, float]:
+        """
+        (count, ITC) of unpaid taxable invoices dated more than `days` ago.
+        Section 16(2)(b) proviso — ITC reverses if the supplier is unpaid
+        after 180 days. A bisect over the date-sorted unpaid list.
+        """
+        cutoff = (date.today() - timedelta(days=days)).isoformat()
+        n = bisect_left(self._unpaid_dates, cutoff)
+        return n, self._unpaid_itc_cum[n]
+
+    def _snapshot(self, name: str, compute) -> Any:
+        """Return compute()'s cached result while the graph is unchanged. Shared — do not mutate."""
+        cached = self._snapshots.get(name)
+        if cached is None or cached[0] != self._graph_version:
+            cached = self._snapshots[name] = (self._graph_version, compute())
+        return cached[1]
+
     def find_risk_clusters(self) -> list[dict]:
+        """Top 10 risk clusters — see _compute_risk_clusters. Cached per graph version."""
+        return self._snapshot("clusters", self._compute_risk_clusters)
+
+    def _compute_risk_clusters(self) -> list[dict]:
         """
         Build undirected GSTIN transaction subgraph and find connected components.
         Each connected component = a trading cluster.
@@ -674,7 +786,10 @@ class GSTKnowledgeGraph:
         return sorted(clusters, key=lambda x: x["avg_risk_score"], reverse=True)[:10]
 
     def get_graph_stats(self) -> dict:
-        """Return comprehensive graph statistics."""
+        """Return comprehensive graph statistics. Cached per graph version."""
+        return self._snapshot("stats", self._compute_graph_stats)
+
+    def _compute_graph_stats(self) -> dict:
         type_counts: dict = defaultdict(int)
         for _, data in self.G.nodes(data=True):
             type_counts[data.get("type", "Unknown")] += 1
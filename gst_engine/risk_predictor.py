@@ -27,9 +27,11 @@ Scoring Model:
   - Handles cold-start vendors with few transactions
 """
 
-from reconciliation_engine import GSTKnowledgeGraph
+import heapq
 from typing import Optional
 
+from reconciliation_engine import GSTKnowledgeGraph
+
 
 CATEGORY_THRESHOLDS = {
     "CRITICAL": 80,
@@ -46,8 +48,11 @@ def _score_to_category(score: float) -> str:
     return "LOW"
 
 
+_CATEGORY_ORDER = {"CRITICAL": 4, "HIGH": 3, "MEDIUM": 2, "LOW": 1}
+
+
 def _category_order(cat: str) -> int:
-    return {"CRITICAL": 4, "HIGH": 3, "MEDIUM": 2, "LOW": 1}.get(cat, 0)
+    return _CATEGORY_ORDER.get(cat, 0)
 
 
 class VendorRiskPredictor:
@@ -66,6 +71,9 @@ class VendorRiskPredictor:
         self.G            = kg.G
         self._vendor_map  = {v["gstin"]: v for v in kg.vendors}
         self._tp_map      = {tp["gstin"]: tp for tp in kg.taxpayers}
+        # (predictions, moving_up, moving_down, stable) — the graph is read-only
+        # after load, so the full-portfolio pass runs once per predictor
+        self._all_predictions: Optional[tuple] = None
 
     # ----------------------------------------------------------
     # FEATURE EXTRACTION
@@ -262,43 +270,53 @@ class VendorRiskPredictor:
             "recommendation":         recommendations[predicted_cat],
         }
 
-    def predict_all_vendors(self) -> dict:
+    def predict_all_vendors(self, top_n: Optional[int] = None) -> dict:
         """
         Run predictions for all GSTINs in the graph.
         Returns sorted list + movement summary (UP/DOWN/STABLE).
+        With `top_n`, only the N highest predicted scores are ranked and returned
+        (movement counts still cover every vendor).
         """
-        predictions = []
-        for vendor in self.kg.vendors:
-            result = self.predict_next_period_risk(vendor["gstin"])
-            if "error" not in result:
-                predictions.append(result)
-
-        predictions.sort(key=lambda x: x["predicted_risk_score"], reverse=True)
-
-        # Movement analysis
-        moving_up    = []
-        moving_down  = []
-        stable       = []
-        for p in predictions:
-            curr = _category_order(p["current_risk_category"])
-            pred = _category_order(p["predicted_risk_category"])
-            if pred > curr:
-                moving_up.append(p["gstin"])
-            elif pred < curr:
-                moving_down.append(p["gstin"])
-            else:
-                stable.append(p["gstin"])
+        predictions, moving_up, moving_down, stable = self._predict_portfolio()
+
+        by_score = lambda x: x["predicted_risk_score"]
+        if top_n is None:
+            ranked = sorted(predictions, key=by_score, reverse=True)
+        else:
+            ranked = heapq.nlargest(top_n, predictions, key=by_score)
 
         return {
             "total_vendors":  len(predictions),
-            "moving_up":      len(moving_up),    # Risk increasing
-            "moving_down":    len(moving_down),  # Risk decreasing
-            "stable":         len(stable),
-            "predictions":    predictions,
-            "alert":          (f"{len(moving_up)} vendors predicted to worsen next period"
+            "moving_up":      moving_up,    # Risk increasing
+            "moving_down":    moving_down,  # Risk decreasing
+            "stable":         stable,
+            "predictions":    ranked,
+            "alert":          (f"{moving_up} vendors predicted to worsen next period"
                                if moving_up else "No vendors predicted to worsen"),
         }
 
+    def _predict_portfolio(self) -> tuple:
+        """Predict every vendor once and count UP/DOWN/STABLE category movements."""
+        if self._all_predictions is None:
+            predictions = []
+            for vendor in self.kg.vendors:
+                result = self.predict_next_period_risk(vendor["gstin"])
+                if "error" not in result:
+                    predictions.append(result)
+
+            moving_up = moving_down = stable = 0
+            for p in predictions:
+                curr = _category_order(p["current_risk_category"])
+                pred = _category_order(p["predicted_risk_category"])
+                if pred > curr:
+                    moving_up += 1
+                elif pred < curr:
+                    moving_down += 1
+                else:
+                    stable += 1
+            self._all_predictions = (predictions, moving_up, moving_down, stable)
+        return self._all_predictions
+
     def explain_prediction(self, gstin: str) -> str:
         """
         Generate a human-readable prediction explanation paragraph.
@@ -356,7 +374,7 @@ if __name__ == "__main__":
     print("  VENDOR RISK PREDICTOR — NEXT PERIOD FORECAST")
     print("=" * 65)
 
-    all_result = predictor.predict_all_vendors()
+    all_result = predictor.predict_all_vendors(top_n=5)
     print(f"\n[Stats] Prediction Summary:")
     print(f"  Total vendors analyzed  : {all_result['total_vendors']}")
     print(f"  Risk increasing ((UP))     : {all_result['moving_up']}")